@@ -1,7 +1,15 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from app.schemas.audio import AudioRequest, AudioResponse
 from app.services.piper import PiperService
+from app.services.upload_queue import upload_queue
+from app.core.events import event_bus
+from app.core.scheduler import job_scheduler
 from app.services.storage import StorageService
+from app.services.piper_pool import piper_pool
+from app.core.logger import gui_logger
+from app.core import metrics
 
 router = APIRouter()
 
@@ -11,10 +19,16 @@ async def synthesize_audio(request: AudioRequest):
     
     try:
         # 1. Generar audio localmente
-        full_path = PiperService.synthesize(request.texto, filename)
+        # (fuera del event loop, en un worker Piper reservado para peticiones
+        # interactivas: no espera a que termine un chunk de libro)
+        full_path = await run_in_threadpool(
+            PiperService.synthesize, request.texto, filename
+        )
         
         # 2. Subir a Cloud (si está configurado)
-        cloud_uri = StorageService.upload_file(full_path, filename)
+        cloud_uri = await run_in_threadpool(
+            StorageService.upload_file, full_path, filename
+        )
         
         return AudioResponse(
             status="success",
@@ -24,10 +38,85 @@ async def synthesize_audio(request: AudioRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/synthesize/stream")
+async def synthesize_audio_stream(request: AudioRequest):
+    """
+    Streams a WAV (chunked transfer) while Piper is still rendering, so
+    interactive clients can start playback right away. Nothing is stored.
+    """
+    return StreamingResponse(
+        PiperService.stream_wav(request.texto),
+        media_type="audio/wav",
+        headers={"X-Audio-Id": request.id, "Cache-Control": "no-store"},
+    )
+
+def _runtime_metrics():
+    """Gauges and counters read from the live components at scrape time."""
+    pool = piper_pool.stats()
+    uploads = upload_queue.stats()
+    jobs = job_scheduler.stats()
+    cache = PiperService.cache_stats()
+    events = event_bus.stats()
+    yield "fognode_piper_workers", "gauge", "Piper worker processes, by state.", [
+        ("fognode_piper_workers", {"state": "alive"}, pool["alive"]),
+        ("fognode_piper_workers", {"state": "busy"}, pool["busy"]),
+    ]
+    yield "fognode_piper_worker_restarts", "counter", "Piper worker restarts.", [
+        ("fognode_piper_worker_restarts_total", {}, pool["restarts"]),
+    ]
+    yield "fognode_jobs", "gauge", "Book jobs in the scheduler, by state.", [
+        ("fognode_jobs", {"state": "running"}, jobs["running"]),
+        ("fognode_jobs", {"state": "queued"}, jobs["queued"]),
+    ]
+    depth = "fognode_upload_queue_depth"
+    yield depth, "gauge", "Parts in the upload stage, by state.", [
+        (depth, {"state": "waiting"}, uploads["waiting"]),
+        (depth, {"state": "in_progress"}, uploads["in_progress"]),
+    ]
+    yield (
+        "fognode_upload_retries", "counter",
+        "Upload attempts retried after a transient error.",
+        [("fognode_upload_retries_total", {}, uploads["retries"])],
+    )
+    lookups = "fognode_synthesis_cache_lookups"
+    yield lookups, "counter", "Synthesis cache lookups, by result.", [
+        (f"{lookups}_total", {"result": "hit"}, cache["hits"]),
+        (f"{lookups}_total", {"result": "miss"}, cache["misses"]),
+    ]
+    yield "fognode_synthesis_cache_bytes", "gauge", "Size of the synthesis cache.", [
+        ("fognode_synthesis_cache_bytes", {}, cache["bytes"]),
+    ]
+    yield (
+        "fognode_event_subscribers", "gauge",
+        "Open job event subscriptions (SSE streams, GUI).",
+        [("fognode_event_subscribers", {}, events["subscribers"])],
+    )
+    yield (
+        "fognode_log_records_dropped", "counter",
+        "Log records dropped because sinks fell behind.",
+        [("fognode_log_records_dropped_total", {}, gui_logger.dropped)],
+    )
+
+metrics.registry.add_collector(_runtime_metrics)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text exposition of the node's metrics."""
+    return PlainTextResponse(
+        metrics.registry.render(), media_type="text/plain; version=0.0.4"
+    )
+
 @router.get("/status")
 async def system_status():
     return {
         "status": "online",
         "service": "FogNode Audio",
-        "version": "0.1.0"
+        "version": "0.1.0",
+        # Counters only: the health check itself runs on the pool's monitor
+        # thread (it takes the pool lock and may restart processes)
+        "piper_pool": piper_pool.stats(),
+        "synthesis_cache": PiperService.cache_stats(),
+        "upload_queue": upload_queue.stats(),
+        "jobs": job_scheduler.stats(),
+        "events": event_bus.stats()
     }
@@ -1,55 +1,267 @@
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException
-from typing import List
-from app.schemas.jobs import JobResponse, JobStatus
+import re
+import json
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.jobs import JobResponse, JobStatus, JobTimings, OutputFile
 from app.core.jobs import JobManager
+from app.core.scheduler import job_scheduler, QueueFullError
+from app.core.executors import io_executor, run_in
+from app.core.events import event_bus, Event, AsyncSubscription
+from app.core.config import settings
 from app.services.book_processor import BookProcessor
 from app.services.storage import StorageService
+from app.services.spool import SpoolService, UploadTooLargeError
+from app.services.checkpoint import JobCheckpoint
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 200
+# A per-job stream ends once the job reaches one of these
+FINAL_STATUSES = {
+    JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value,
+}
+PART_NUMBER = re.compile(r"_part_(\d+)\.\w+$")
+
+def _public_url(uri: str) -> str:
+    return StorageService.get_public_url(uri) if uri.startswith("gs://") else uri
+
+def _to_public_urls(job: JobResponse):
+    if job.output_files:
+        job.output_files = [_public_url(uri) for uri in job.output_files]
+    if job.outputs:
+        job.outputs = [
+            OutputFile(path=_public_url(o.path), format=o.format) for o in job.outputs
+        ]
+
+def _part_number(path: str) -> int:
+    match = PART_NUMBER.search(path)
+    return int(match.group(1)) if match else 0
+
+def _for_client(job: JobResponse, timings: Optional[JobTimings] = None) -> JobResponse:
+    # Timings can be large (one entry per chunk): only detail views pass them.
+    # Parts retried after a failure or restart are stored last; list them in
+    # reading order. New lists: the copy is shallow and may share the store's
+    # lists
+    job = job.model_copy(update={
+        "timings": timings,
+        "output_files": sorted(job.output_files, key=_part_number),
+        "outputs": sorted(job.outputs, key=lambda o: _part_number(o.path)),
+    })
+    # Convert gs:// URIs to public URLs for frontend
+    _to_public_urls(job)
+    job.queue_position = job_scheduler.queue_position(job.id)
+    return job
+
+def _queue_full(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many books queued on this node, try again later",
+        headers={"Retry-After": str(retry_after)},
+    )
+
 @router.post("/upload", response_model=JobResponse)
 async def upload_book(
-    background_tasks: BackgroundTasks, 
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    priority: int = Query(0, description="Higher runs first among queued jobs")
 ):
     allowed_extensions = ('.txt', '.pdf', '.epub')
     if not file.filename.lower().endswith(allowed_extensions):
         raise HTTPException(status_code=400, detail="Only .txt, .pdf, and .epub files are supported")
     
-    content = await file.read()
+    # Reject before reading the body if the node cannot take more work
+    if job_scheduler.is_full:
+        raise _queue_full(job_scheduler.retry_after())
     
-    # Create Job
-    job = JobManager.create_job(file.filename)
+    # Stream to disk; the book is never held in memory as a whole
+    try:
+        spool_path = await SpoolService.spool_upload(file)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     
-    # Start Background Processing
-    background_tasks.add_task(BookProcessor.process_book, job.id, content, file.filename)
+    # Create Job, with a checkpoint so it survives a restart even while queued
+    try:
+        job = JobManager.create_job(file.filename)
+        checkpoint = await run_in(
+            io_executor, JobCheckpoint.create, job.id, file.filename, spool_path
+        )
+    except Exception:
+        SpoolService.remove(spool_path)
+        raise
     
-    return job
+    # Start now or queue behind the jobs already running
+    try:
+        BookProcessor.schedule(job.id, spool_path, file.filename, priority)
+    except QueueFullError as e:
+        JobManager.delete_job(job.id)
+        BookProcessor.discard_source(checkpoint)
+        raise _queue_full(e.retry_after)
+    
+    return _for_client(job)
 
 @router.get("/jobs", response_model=List[JobResponse])
-async def list_jobs():
-    jobs = JobManager.list_jobs()
-    # Convert gs:// URIs to public URLs for frontend
-    for job in jobs:
-        if job.output_files:
-            job.output_files = [
-                StorageService.get_public_url(uri) if uri.startswith("gs://") else uri
-                for uri in job.output_files
-            ]
-    return jobs
+async def list_jobs(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[JobStatus] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to return, e.g. id,status,processed_chunks",
+    ),
+):
+    """
+    Jobs newest first, one page at a time. The next page's cursor is in the
+    X-Next-Cursor header (absent on the last page). With `fields`, each job
+    only carries those fields (plus id).
+    """
+    selected = None
+    if fields:
+        selected = {"id"} | {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = selected - set(JobResponse.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+    
+    try:
+        page = JobManager.list_jobs(
+            limit, cursor, status, created_after, created_before, selected
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {"X-Next-Cursor": page.next_cursor} if page.next_cursor else {}
+    # Timings only when asked for by name
+    with_timings = bool(selected) and "timings" in selected
+    jobs = [
+        _for_client(job, job.timings if with_timings else None) for job in page.jobs
+    ]
+    return JSONResponse(
+        content=[job.model_dump(mode="json", include=selected) for job in jobs],
+        headers=headers,
+    )
+
+def _sse(event_type: str, data: dict, event_id: int = None) -> str:
+    lines = [f"event: {event_type}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+def _event_for_client(event: Event) -> str:
+    data = {"job_id": event.job_id, **event.data}
+    if event.type == "new_file":
+        data["file_path"] = _public_url(data["file_path"])
+    return _sse(event.type, data, event.seq)
+
+async def _stream(request: Request, subscription: AsyncSubscription,
+                  snapshot: JobResponse = None):
+    try:
+        if snapshot is not None:
+            yield _sse("snapshot", snapshot.model_dump(mode="json"))
+            if snapshot.status.value in FINAL_STATUSES:
+                return
+        while not await request.is_disconnected():
+            events = await subscription.next_batch(settings.EVENT_HEARTBEAT_SECONDS)
+            if not events:
+                # Keep-alive for proxies; also how a gone client is noticed
+                yield ": ping\n\n"
+                continue
+            dropped = subscription.take_dropped()
+            if dropped:
+                # Fell behind: tell the client to re-read state instead of
+                # trusting deltas
+                yield _sse("overflow", {"dropped": dropped})
+            for event in events:
+                yield _event_for_client(event)
+                if snapshot is not None and (
+                    event.type == "deleted"
+                    or event.data.get("status") in FINAL_STATUSES
+                ):
+                    return
+    finally:
+        event_bus.unsubscribe(subscription)
+
+def _event_stream(request: Request, subscription: AsyncSubscription,
+                  snapshot: JobResponse = None) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(request, subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/jobs/events")
+async def all_job_events(request: Request):
+    """
+    Server-Sent Events for every job: created, progress, status_change,
+    new_file, deleted.
+    """
+    return _event_stream(request, event_bus.subscribe())
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-Sent Events for one job, instead of polling GET /jobs/{job_id}.
+    Starts with a `snapshot` of the job and ends when it finishes.
+    """
+    # Subscribe before reading the snapshot so no update falls in between
+    subscription = event_bus.subscribe(job_id)
+    job = JobManager.get_job(job_id)
+    if not job:
+        event_bus.unsubscribe(subscription)
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _event_stream(request, subscription, _for_client(job))
 
 @router.get("/jobs/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str):
+async def get_job(
+    job_id: str,
+    detail: bool = Query(False, description="Include the per-stage timing breakdown"),
+):
     job = JobManager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    # Convert gs:// URIs to public URLs for frontend
-    if job.output_files:
-        job.output_files = [
-            StorageService.get_public_url(uri) if uri.startswith("gs://") else uri
-            for uri in job.output_files
-        ]
-    return job
+    if not detail:
+        return _for_client(job)
+    # Live while the job runs, as stored once it stopped
+    return _for_client(job, BookProcessor.live_timings(job_id) or job.timings)
+
+@router.post("/jobs/{job_id}/retry", response_model=JobResponse)
+async def retry_job(job_id: str):
+    """Render again only the parts of a failed job that did not finish."""
+    job = JobManager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.FAILED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job is {job.status.value}, only failed jobs can be retried",
+        )
+    
+    try:
+        retried = await BookProcessor.retry(job_id)
+    except QueueFullError as e:
+        raise _queue_full(e.retry_after)
+    if not retried:
+        raise HTTPException(
+            status_code=409, detail="Nothing to resume from; upload the book again"
+        )
+    return _for_client(JobManager.get_job(job_id))
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Stop a queued or running job: kills its Piper processes and removes its parts."""
+    job = JobManager.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await BookProcessor.cancel(job_id):
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job.status.value}, nothing to cancel"
+        )
+    return _for_client(JobManager.get_job(job_id))
 
 @router.delete("/jobs/{job_id}")
 async def delete_job(job_id: str):
@@ -57,6 +269,8 @@ async def delete_job(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    # Stop its work (and any queued start) before the record goes away
+    await BookProcessor.cancel(job_id)
     success = JobManager.delete_job(job_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete job")
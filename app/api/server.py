@@ -9,6 +9,12 @@ from app.api.endpoints import router as audio_router
 from app.api.endpoints_books import router as books_router
 from app.core.config import settings
 from app.core.logger import gui_logger
+from app.core.executors import shutdown_executors
+from app.core.jobs import JobManager
+from app.core.scheduler import job_scheduler
+from app.services.piper_pool import piper_pool
+from app.services.piper import stream_processes
+from app.services.book_processor import BookProcessor
 from fastapi.staticfiles import StaticFiles
 import os
 
@@ -27,8 +33,25 @@ async def lifespan(app: FastAPI):
             gui_logger.log("-" * 30)
     except Exception as err:
         gui_logger.log(f"Ngrok error: {err}")
+    try:
+        # Warm up Piper workers so the first request does not pay model load
+        piper_pool.start()
+        stream_processes.fill()
+    except Exception as err:
+        gui_logger.log(f"Piper pool error: {err}")
+    try:
+        # Pick up books interrupted by the last shutdown or crash
+        await BookProcessor.resume_interrupted()
+    except Exception as err:
+        gui_logger.log(f"Resume error: {err}")
     yield
     gui_logger.log("Stopping API")
+    await job_scheduler.shutdown()
+    shutdown_executors()
+    piper_pool.shutdown()
+    await stream_processes.shutdown()
+    # Durably write buffered job updates
+    JobManager.shutdown()
     ngrok.kill()
 
 def create_app() -> FastAPI:
@@ -13,10 +13,104 @@ class Settings:
     AUDIO_OUTPUT_DIR = os.getenv("AUDIO_OUTPUT_DIR", "generated_audio")
     USE_CUDA = os.getenv("USE_CUDA", "false").lower() == "true"
     
+    # Logging: records kept in memory, max sink refresh rate, optional JSON-lines file
+    LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", 2000))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 0.2))
+    LOG_JSON_PATH = os.getenv("LOG_JSON_PATH")
+    # Log lines shown in the GUI
+    GUI_LOG_LINES = int(os.getenv("GUI_LOG_LINES", 200))
+    # Max redraws per second of the GUI job dashboard
+    GUI_REFRESH_FPS = float(os.getenv("GUI_REFRESH_FPS", 4))
+    
+    # Uploads are streamed to disk instead of being read into RAM
+    UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", "upload_spool")
+    MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", 200)) * 1024 * 1024
+    
+    # Chunk sizes in characters (see app/services/chunking.py)
+    CHUNK_MIN_CHARS = int(os.getenv("CHUNK_MIN_CHARS", 5000))
+    CHUNK_TARGET_CHARS = int(os.getenv("CHUNK_TARGET_CHARS", 25000))
+    CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", 30000))
+    # Small first chunk so the first audio part is ready quickly (0 = off)
+    CHUNK_FIRST_CHARS = int(os.getenv("CHUNK_FIRST_CHARS", 2000))
+    
+    # Books rendered at once, and books allowed to wait before /upload answers 429
+    MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", 1))
+    MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 20))
+    # Per-chunk progress for resuming jobs after a restart, and retries per failed chunk
+    CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "data/checkpoints")
+    CHUNK_MAX_RETRIES = int(os.getenv("CHUNK_MAX_RETRIES", 2))
+    # Parallel chunk synthesis (defaults to one worker per core)
+    SYNTHESIS_WORKERS = int(os.getenv("SYNTHESIS_WORKERS", os.cpu_count() or 1))
+    
+    # Output audio format for book parts: wav | flac | opus (ffmpeg required)
+    AUDIO_FORMAT = os.getenv("AUDIO_FORMAT", "wav").lower()
+    OPUS_BITRATE = os.getenv("OPUS_BITRATE", "24k")
+    FFMPEG_BIN_PATH = os.getenv("FFMPEG_BIN_PATH", "ffmpeg")
+    ENCODER_WORKERS = int(os.getenv("ENCODER_WORKERS", 2))
+    
+    # Executors that keep blocking work off the event loop
+    UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", 4))
+    # Upload stage: parts waiting for a worker, and retries of transient errors
+    UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", 16))
+    UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", 5))
+    UPLOAD_RETRY_BASE_SECONDS = float(os.getenv("UPLOAD_RETRY_BASE_SECONDS", 1))
+    IO_WORKERS = int(os.getenv("IO_WORKERS", 4))
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 4))
+    
+    # PDFs with at least this many pages are extracted on a process pool
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 100))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 20))
+    PDF_EXTRACTION_PROCESSES = int(
+        os.getenv("PDF_EXTRACTION_PROCESSES", os.cpu_count() or 1)
+    )
+    EPUB_PARSE_WORKERS = int(os.getenv("EPUB_PARSE_WORKERS", os.cpu_count() or 1))
+    
+    # Piper worker pool (long-lived processes, model loaded once). Workers kept
+    # for /synthesize come on top of the SYNTHESIS_WORKERS used by books
+    PIPER_INTERACTIVE_WORKERS = int(os.getenv("PIPER_INTERACTIVE_WORKERS", 1))
+    PIPER_POOL_SIZE = int(
+        os.getenv("PIPER_POOL_SIZE", SYNTHESIS_WORKERS + PIPER_INTERACTIVE_WORKERS)
+    )
+    PIPER_HEALTH_CHECK_INTERVAL = float(os.getenv("PIPER_HEALTH_CHECK_INTERVAL", 30))
+    # Seconds one request may take before its worker is killed (0 = no limit)
+    PIPER_REQUEST_TIMEOUT = float(os.getenv("PIPER_REQUEST_TIMEOUT", 300))
+    
+    # Live /synthesize/stream: concurrent Piper processes, processes kept
+    # loaded ahead of requests, and read size
+    STREAM_MAX_CONCURRENT = int(os.getenv("STREAM_MAX_CONCURRENT", 2))
+    STREAM_WARM_PROCESSES = int(os.getenv("STREAM_WARM_PROCESSES", 1))
+    STREAM_READ_BYTES = int(os.getenv("STREAM_READ_BYTES", 4096))
+    
+    # Content-addressed synthesis cache (0 MB = disabled)
+    SYNTHESIS_CACHE_DIR = os.getenv(
+        "SYNTHESIS_CACHE_DIR", os.path.join(AUDIO_OUTPUT_DIR, ".cache")
+    )
+    SYNTHESIS_CACHE_MAX_BYTES = (
+        int(os.getenv("SYNTHESIS_CACHE_MAX_MB", 2048)) * 1024 * 1024
+    )
+    
     # Google Cloud Platform
     GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
+    # Job store: auto (Firestore if configured, else SQLite) | firestore |
+    # sqlite | memory
+    JOB_STORE = os.getenv("JOB_STORE", "auto")
+    SQLITE_PATH = os.getenv("SQLITE_PATH", "data/jobs.db")
+    # Seconds between batched job-progress writes (Firestore / SQLite)
+    JOB_FLUSH_INTERVAL = float(os.getenv("JOB_FLUSH_INTERVAL", 2))
+    # Seconds a cached job lookup is served before re-reading the store (0 = off)
+    JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", 2))
+    # Job event streams: events buffered per subscriber, and SSE keep-alive period
+    EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))
+    EVENT_HEARTBEAT_SECONDS = float(os.getenv("EVENT_HEARTBEAT_SECONDS", 15))
     BUCKET_NAME = os.getenv("BUCKET_NAME")
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    # HTTP connections kept open by the shared Cloud Storage client
+    GCS_HTTP_POOL_SIZE = int(os.getenv("GCS_HTTP_POOL_SIZE", 16))
+    # Resumable upload piece size (multiple of 256 KB) and parallel composite uploads
+    GCS_RESUMABLE_CHUNK_MB = int(os.getenv("GCS_RESUMABLE_CHUNK_MB", 8))
+    GCS_COMPOSITE_THRESHOLD_MB = int(os.getenv("GCS_COMPOSITE_THRESHOLD_MB", 100))
+    GCS_COMPOSITE_PART_MB = int(os.getenv("GCS_COMPOSITE_PART_MB", 32))
+    GCS_COMPOSITE_PARALLELISM = int(os.getenv("GCS_COMPOSITE_PARALLELISM", 4))
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,184 @@
+import asyncio
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional
+from app.core.config import settings
+
+
+class Event(NamedTuple):
+    seq: int
+    job_id: str
+    type: str
+    data: dict
+
+
+class Subscription:
+    """
+    Pending events of one subscriber, optionally limited to one job.
+
+    The queue is bounded: consecutive "progress" events of a job are merged
+    into the one still pending, and once `maxsize` events are waiting the
+    oldest is dropped and counted in `dropped`, so a slow subscriber costs
+    memory proportional to its queue, never to the event rate.
+    """
+
+    def __init__(self, job_id: Optional[str], maxsize: int, wake: Callable[[], None]):
+        self.job_id = job_id
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        self._wake = wake
+        self._pending: "OrderedDict[tuple, Event]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def wants(self, job_id: str) -> bool:
+        return self.job_id is None or self.job_id == job_id
+
+    def push(self, event: Event):
+        with self._lock:
+            if self.closed:
+                return
+            if event.type == "progress":
+                key = (event.job_id, "progress")
+                pending = self._pending.get(key)
+                if pending is not None:
+                    event = event._replace(data={**pending.data, **event.data})
+            else:
+                key = (event.job_id, event.seq)
+            self._pending[key] = event
+            while len(self._pending) > self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+        self._wake()
+
+    def drain(self) -> List[Event]:
+        """Take every pending event, oldest first."""
+        with self._lock:
+            events = list(self._pending.values())
+            self._pending.clear()
+        return events
+
+    def take_dropped(self) -> int:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class AsyncSubscription(Subscription):
+    """Subscription consumed from the event loop (SSE streams)."""
+
+    def __init__(self, job_id: Optional[str], maxsize: int):
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        super().__init__(job_id, maxsize, self._signal)
+
+    def _signal(self):
+        # Publishers run on executor threads
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Loop already closed
+            self.closed = True
+
+    async def next_batch(self, timeout: float = None) -> List[Event]:
+        """Wait for events; an empty list means `timeout` elapsed first."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        return self.drain()
+
+
+class Listener(Subscription):
+    """Subscription delivered to a plain callback on its own thread (the GUI)."""
+
+    def __init__(self, callback: Callable[[str, str, dict], None], maxsize: int,
+                 name: str):
+        self._ready = threading.Event()
+        super().__init__(None, maxsize, self._ready.set)
+        self.callback = callback
+        self._thread = threading.Thread(
+            target=self._run, name=f"events-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self.closed:
+            self._ready.wait()
+            self._ready.clear()
+            for event in self.drain():
+                try:
+                    self.callback(event.job_id, event.type, event.data)
+                except Exception as e:
+                    # A failing listener must not stop the others
+                    print(f"Event listener error: {e}")
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+
+class EventBus:
+    """
+    Fan-out of job events to any number of subscribers.
+
+    `publish` never blocks on a subscriber: it only appends to each bounded
+    queue, so a stalled SSE client or a busy GUI cannot slow down the jobs.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def publish(self, job_id: str, event_type: str, data: dict):
+        with self._lock:
+            event = Event(next(self._seq), job_id, event_type, dict(data))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.wants(job_id):
+                subscription.push(event)
+
+    def subscribe(self, job_id: str = None) -> AsyncSubscription:
+        """Subscribe from the event loop to one job's events, or to all of them."""
+        subscription = AsyncSubscription(job_id, self.queue_size)
+        self._add(subscription)
+        return subscription
+
+    def add_listener(self, callback: Callable[[str, str, dict], None],
+                     name: str = "listener") -> Listener:
+        """
+        Deliver every event to `callback(job_id, event_type, data)` on a
+        background thread.
+        """
+        listener = Listener(callback, self.queue_size, name)
+        self._add(listener)
+        return listener
+
+    def _add(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.append(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+        if isinstance(subscription, Listener):
+            subscription.close()
+        else:
+            subscription.closed = True
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "pending": sum(len(s._pending) for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+
+event_bus = EventBus(settings.EVENT_QUEUE_SIZE)
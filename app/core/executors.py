@@ -0,0 +1,91 @@
+import asyncio
+import functools
+import threading
+import multiprocessing
+from typing import Optional
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from app.core.config import settings
+
+# Dedicated pools keep blocking work (Piper pipes, GCS uploads, text extraction,
+# job-store round trips) off the uvicorn event loop. They are separate so a
+# slow upload never occupies a synthesis slot and vice versa.
+
+# Shared across jobs so the node never renders more than SYNTHESIS_WORKERS
+# chunks at once
+synthesis_executor = ThreadPoolExecutor(
+    max_workers=settings.SYNTHESIS_WORKERS, thread_name_prefix="synthesis"
+)
+
+# ffmpeg encoding of finished parts, overlapping synthesis of the next ones
+encoder_executor = ThreadPoolExecutor(
+    max_workers=settings.ENCODER_WORKERS, thread_name_prefix="encoder"
+)
+
+upload_executor = ThreadPoolExecutor(
+    max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload"
+)
+
+# Short blocking calls: job-store round trips, spool writes
+io_executor = ThreadPoolExecutor(
+    max_workers=settings.IO_WORKERS, thread_name_prefix="io"
+)
+
+# One long-running extract->chunk producer per book being processed
+extraction_executor = ThreadPoolExecutor(
+    max_workers=settings.EXTRACTION_WORKERS, thread_name_prefix="extraction"
+)
+
+# EPUB chapter parsing (lxml releases the GIL while parsing)
+parse_executor = ThreadPoolExecutor(
+    max_workers=settings.EPUB_PARSE_WORKERS, thread_name_prefix="parse"
+)
+
+# CPU-bound PDF parsing; created on first large PDF
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+_pdf_process_pool_lock = threading.Lock()
+
+
+def get_pdf_process_pool() -> ProcessPoolExecutor:
+    global _pdf_process_pool
+    with _pdf_process_pool_lock:
+        if _pdf_process_pool is None:
+            # spawn: forking a process that already runs threads is unsafe
+            _pdf_process_pool = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACTION_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_process_pool
+
+
+async def run_in(executor: Executor, func, *args, **kwargs):
+    """Await a blocking call on the given executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_in_settled(executor: Executor, cancelled: Optional[threading.Event],
+                         func, *args):
+    """
+    run_in for work whose side effects a cancel cleans up. If the caller is
+    cancelled while `cancelled` is set, a call still queued is dropped and
+    one already running is waited for, so nothing is written after the
+    caller's cleanup. Otherwise (e.g. shutdown) it behaves like run_in.
+    """
+    future = executor.submit(func, *args)
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # A running call cannot be interrupted: `func` should check `cancelled`
+        if not future.cancel() and cancelled is not None and cancelled.is_set():
+            await asyncio.gather(asyncio.wrap_future(future), return_exceptions=True)
+        raise
+
+
+def shutdown_executors():
+    for executor in (synthesis_executor, encoder_executor, upload_executor,
+                     io_executor, extraction_executor, parse_executor):
+        executor.shutdown(wait=False, cancel_futures=True)
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(wait=False, cancel_futures=True)
@@ -1,27 +1,252 @@
 import uuid
 import os
-from typing import Dict, List, Optional
-from datetime import datetime
-from app.schemas.jobs import JobResponse, JobStatus
+import json
+import sqlite3
+import time
+import base64
+import atexit
+import threading
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple,
+)
+from datetime import datetime, timezone
+from app.schemas.jobs import JobResponse, JobStatus, JobTimings, OutputFile
+from app.core.config import settings
 from app.core.logger import gui_logger
+from app.core.events import event_bus
+from app.core import metrics
 
 # Try to import Firestore, fallback to in-memory if not available
 try:
     from google.cloud import firestore
+    from google.api_core import exceptions as gcloud_exceptions
     FIRESTORE_AVAILABLE = True
 except ImportError:
     FIRESTORE_AVAILABLE = False
     gui_logger.log("⚠️ Firestore not available, using in-memory storage")
 
 
+class JobQuery(NamedTuple):
+    """Parameters of a job listing (hashable, so it can key the cache)."""
+    limit: int = 50
+    cursor: Optional[str] = None
+    status: Optional[JobStatus] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    # Only these fields are needed (None = all); backends may skip the rest
+    fields: Optional[FrozenSet[str]] = None
+
+
+class JobPage(NamedTuple):
+    jobs: List[JobResponse]
+    # Opaque cursor for the next page, None on the last one
+    next_cursor: Optional[str] = None
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Jobs store naive UTC timestamps; compare filters the same way."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def encode_cursor(job: JobResponse) -> str:
+    """Position after `job` in (created_at, id) descending order."""
+    raw = json.dumps([job.created_at.isoformat(), job.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        created_at, job_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), job_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class WriteBehindBuffer:
+    """
+    Write-behind buffer for job updates.
+    
+    Field updates are coalesced per job (the last value wins) and new outputs
+    are collected in order; a background thread hands them to `write` every
+    `flush_interval` seconds, or right away when requested (status changes),
+    so callers never wait on the store. `write(fields, outputs)` returns the
+    ids of jobs whose writes failed; those are retried on the next flush.
+    """
+    
+    def __init__(
+        self,
+        write: Callable[[Dict[str, dict], Dict[str, List[dict]]], Iterable[str]],
+        flush_interval: float,
+    ):
+        self.write = write
+        self.flush_interval = flush_interval
+        self._fields: Dict[str, dict] = {}
+        self._outputs: Dict[str, List[dict]] = {}
+        self._lock = threading.Lock()
+        # Serializes flushes between the background thread and close()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+    
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="job-flush", daemon=True
+            )
+            self._thread.start()
+    
+    def update(self, job_id: str, fields: dict, flush_now: bool = False):
+        with self._lock:
+            if not self._closed:
+                self._fields.setdefault(job_id, {}).update(fields)
+                self._ensure_thread()
+        if self._closed:
+            self.write({job_id: fields}, {})
+        elif flush_now:
+            self._wake.set()
+    
+    def add_output(self, job_id: str, output: dict):
+        with self._lock:
+            if not self._closed:
+                self._outputs.setdefault(job_id, []).append(output)
+                self._ensure_thread()
+        if self._closed:
+            self.write({}, {job_id: [output]})
+    
+    def overlay(self, data: dict) -> dict:
+        """Overlay writes still sitting in the buffer on a stored job dict."""
+        with self._lock:
+            fields = dict(self._fields.get(data.get("id"), {}))
+            outputs = list(self._outputs.get(data.get("id"), []))
+        data.update(fields)
+        if outputs:
+            data["output_files"] = list(data.get("output_files", []))
+            data["outputs"] = list(data.get("outputs", []))
+            for output in outputs:
+                if output not in data["outputs"]:
+                    data["outputs"].append(output)
+                    data["output_files"].append(output["path"])
+        return data
+    
+    def discard(self, job_id: str):
+        with self._lock:
+            self._fields.pop(job_id, None)
+            self._outputs.pop(job_id, None)
+    
+    def clear_outputs(self, job_id: str, clear: Callable[[], None]):
+        """
+        Drop the job's pending outputs and run `clear` (which removes the
+        stored ones) between flushes, so none written before lands after it.
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._outputs.pop(job_id, None)
+            clear()
+    
+    def _requeue(self, fields: Dict[str, dict], outputs: Dict[str, List[dict]]):
+        """Put back writes that failed; anything newer takes precedence."""
+        with self._lock:
+            for job_id, update in fields.items():
+                self._fields[job_id] = {**update, **self._fields.get(job_id, {})}
+            for job_id, items in outputs.items():
+                self._outputs[job_id] = items + self._outputs.get(job_id, [])
+    
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                fields, self._fields = self._fields, {}
+                outputs, self._outputs = self._outputs, {}
+            if not fields and not outputs:
+                return
+            try:
+                # Callers only enqueue: this is the store round trip
+                with metrics.job_store_seconds.labels(operation="flush").time():
+                    failed = set(self.write(fields, outputs) or ())
+            except Exception as e:
+                gui_logger.log(
+                    f"⚠️ Error guardando progreso de jobs, se reintentará: {e}"
+                )
+                failed = fields.keys() | outputs.keys()
+            if failed:
+                metrics.job_store_write_failures.inc(len(failed))
+                self._requeue(
+                    {job_id: fields[job_id] for job_id in failed if job_id in fields},
+                    {job_id: outputs[job_id] for job_id in failed if job_id in outputs},
+                )
+    
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                gui_logger.log(f"⚠️ Error en flush de jobs: {e}")
+    
+    def close(self):
+        """Flush everything still pending; later writes go straight through."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
 class FirestoreJobManager:
     """Job manager that persists jobs to Firestore."""
     
     COLLECTION_NAME = "audiobook_jobs"
     
-    def __init__(self):
-        self.db = firestore.Client()
+    def __init__(self, client=None, flush_interval: float = None):
+        # The client is injectable so a local fake can stand in for Firestore
+        self.db = client or firestore.Client()
         self.collection = self.db.collection(self.COLLECTION_NAME)
+        self.writes = WriteBehindBuffer(
+            self._write_batch,
+            settings.JOB_FLUSH_INTERVAL if flush_interval is None else flush_interval,
+        )
+    
+    # Firestore limit of writes per batch
+    MAX_BATCH_WRITES = 500
+    
+    def _write_batch(self, fields: Dict[str, dict],
+                     outputs: Dict[str, List[dict]]) -> List[str]:
+        """Write buffered updates as batches; returns the ids that failed."""
+        updates = []
+        for job_id in fields.keys() | outputs.keys():
+            update = dict(fields.get(job_id, {}))
+            if outputs.get(job_id):
+                update["output_files"] = firestore.ArrayUnion(
+                    [o["path"] for o in outputs[job_id]]
+                )
+                update["outputs"] = firestore.ArrayUnion(outputs[job_id])
+            updates.append((job_id, update))
+        
+        failed = []
+        for start in range(0, len(updates), self.MAX_BATCH_WRITES):
+            group = updates[start:start + self.MAX_BATCH_WRITES]
+            batch = self.db.batch()
+            for job_id, update in group:
+                batch.update(self.collection.document(job_id), update)
+            try:
+                batch.commit()
+            except Exception:
+                # One deleted job fails the whole batch: retry one by one
+                for job_id, update in group:
+                    try:
+                        self.collection.document(job_id).update(update)
+                    except gcloud_exceptions.NotFound:
+                        pass  # Job deleted meanwhile
+                    except Exception:
+                        failed.append(job_id)
+        return failed
     
     def _job_to_dict(self, job: JobResponse) -> dict:
         return {
@@ -32,6 +257,7 @@ class FirestoreJobManager:
             "processed_chunks": job.processed_chunks,
             "message": job.message,
             "output_files": job.output_files,
+            "outputs": [o.model_dump() for o in job.outputs],
             "created_at": job.created_at.isoformat() if job.created_at else None,
         }
     
@@ -44,7 +270,9 @@ class FirestoreJobManager:
             processed_chunks=data.get("processed_chunks", 0),
             message=data.get("message"),
             output_files=data.get("output_files", []),
+            outputs=[OutputFile(**o) for o in data.get("outputs", [])],
             created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
+            timings=data.get("timings"),
         )
     
     def create_job(self, filename: str) -> JobResponse:
@@ -62,12 +290,39 @@ class FirestoreJobManager:
     def get_job(self, job_id: str) -> Optional[JobResponse]:
         doc = self.collection.document(job_id).get()
         if doc.exists:
-            return self._dict_to_job(doc.to_dict())
+            return self._dict_to_job(self.writes.overlay(doc.to_dict()))
         return None
     
-    def list_jobs(self) -> List[JobResponse]:
-        docs = self.collection.order_by("created_at", direction=firestore.Query.DESCENDING).limit(50).stream()
-        return [self._dict_to_job(doc.to_dict()) for doc in docs]
+    def list_jobs(self, query: JobQuery = JobQuery()) -> JobPage:
+        # Filters combined with this ordering need a composite index on
+        # (status, created_at desc, id desc); Firestore links to it on first use.
+        ref = self.collection
+        if query.status is not None:
+            ref = ref.where(
+                filter=firestore.FieldFilter("status", "==", query.status.value)
+            )
+        if query.created_after is not None:
+            after = _utc_naive(query.created_after).isoformat()
+            ref = ref.where(filter=firestore.FieldFilter("created_at", ">=", after))
+        if query.created_before is not None:
+            before = _utc_naive(query.created_before).isoformat()
+            ref = ref.where(filter=firestore.FieldFilter("created_at", "<", before))
+        ref = ref.order_by("created_at", direction=firestore.Query.DESCENDING)
+        ref = ref.order_by("id", direction=firestore.Query.DESCENDING)
+        if query.cursor:
+            created_at, job_id = decode_cursor(query.cursor)
+            ref = ref.start_after({"created_at": created_at.isoformat(), "id": job_id})
+        if query.fields is not None:
+            # Only transfer what was asked for (plus what the cursor needs)
+            ref = ref.select(sorted(query.fields | {"id", "created_at"}))
+        
+        docs = list(ref.limit(query.limit + 1).stream())
+        jobs = [
+            self._dict_to_job(self.writes.overlay(doc.to_dict()))
+            for doc in docs[:query.limit]
+        ]
+        next_cursor = encode_cursor(jobs[-1]) if len(docs) > query.limit else None
+        return JobPage(jobs, next_cursor)
     
     def update_progress(self, job_id: str, processed_chunks: int, total_chunks: int = None, message: str = None):
         updates = {"processed_chunks": processed_chunks}
@@ -75,21 +330,40 @@ class FirestoreJobManager:
             updates["total_chunks"] = total_chunks
         if message:
             updates["message"] = message
-        self.collection.document(job_id).update(updates)
+        self.writes.update(job_id, updates)
     
     def set_status(self, job_id: str, status: JobStatus, message: str = None):
         updates = {"status": status.value}
         if message:
             updates["message"] = message
-        self.collection.document(job_id).update(updates)
+        # Status changes are written on the next flush, without waiting for the interval
+        self.writes.update(job_id, updates, flush_now=True)
+    
+    def add_output_file(self, job_id: str, file_path: str, audio_format: str = "wav"):
+        self.writes.add_output(job_id, {"path": file_path, "format": audio_format})
+    
+    def set_timings(self, job_id: str, timings: JobTimings):
+        self.writes.update(job_id, {"timings": timings.model_dump()})
+    
+    def clear_outputs(self, job_id: str):
+        def clear():
+            try:
+                self.collection.document(job_id).update(
+                    {"output_files": [], "outputs": []}
+                )
+            except gcloud_exceptions.NotFound:
+                pass  # Job deleted meanwhile
+        self.writes.clear_outputs(job_id, clear)
+    
+    def flush(self):
+        self.writes.flush()
     
-    def add_output_file(self, job_id: str, file_path: str):
-        self.collection.document(job_id).update({
-            "output_files": firestore.ArrayUnion([file_path])
-        })
+    def close(self):
+        self.writes.close()
     
     def delete_job(self, job_id: str) -> bool:
         try:
+            self.writes.discard(job_id)
             self.collection.document(job_id).delete()
             gui_logger.log(f"🗑️ Job eliminado de Firestore: {job_id}")
             return True
@@ -98,10 +372,292 @@ class FirestoreJobManager:
             return False
 
 
+class SQLiteJobManager:
+    """
+    Job manager on an embedded SQLite database (WAL mode).
+    
+    Survives restarts without cloud credentials. Reads go straight to the
+    database; progress and output writes are buffered and committed in one
+    transaction per flush. All SQL text is constant, so sqlite3 reuses its
+    prepared statements.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            status TEXT NOT NULL,
+            total_chunks INTEGER NOT NULL DEFAULT 0,
+            processed_chunks INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            created_at TEXT NOT NULL,
+            timings TEXT
+        );
+        CREATE TABLE IF NOT EXISTS job_outputs (
+            job_id TEXT NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+            seq INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            format TEXT NOT NULL,
+            PRIMARY KEY (job_id, path)
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_jobs_status
+            ON jobs(status, created_at DESC, id DESC);
+    """
+    INSERT_JOB = (
+        "INSERT INTO jobs "
+        "(id, filename, status, total_chunks, processed_chunks, message, created_at) "
+        "VALUES (:id, :filename, :status, :total_chunks, :processed_chunks, "
+        ":message, :created_at)"
+    )
+    SELECT_JOB = "SELECT * FROM jobs WHERE id = ?"
+    SELECT_OUTPUTS = (
+        "SELECT path, format FROM job_outputs WHERE job_id = ? ORDER BY seq"
+    )
+    # Absent fields (NULL) keep their stored value
+    UPDATE_JOB = (
+        "UPDATE jobs SET "
+        "status = COALESCE(:status, status), "
+        "total_chunks = COALESCE(:total_chunks, total_chunks), "
+        "processed_chunks = COALESCE(:processed_chunks, processed_chunks), "
+        "message = COALESCE(:message, message), "
+        "timings = COALESCE(:timings, timings) "
+        "WHERE id = :id"
+    )
+    INSERT_OUTPUT = (
+        "INSERT OR IGNORE INTO job_outputs (job_id, seq, path, format) "
+        "SELECT :job_id, COALESCE(MAX(seq), 0) + 1, :path, :format "
+        "FROM job_outputs WHERE job_id = :job_id"
+    )
+    DELETE_OUTPUTS = "DELETE FROM job_outputs WHERE job_id = ?"
+    DELETE_JOB = "DELETE FROM jobs WHERE id = ?"
+    # Listing: fixed fragments, so each filter combination is one cached statement
+    LIST_FILTERS = {
+        "status": "status = :status",
+        "created_after": "created_at >= :created_after",
+        "created_before": "created_at < :created_before",
+        "cursor": "(created_at, id) < (:cursor_created_at, :cursor_id)",
+    }
+    LIST_ORDER = " ORDER BY created_at DESC, id DESC LIMIT :limit"
+    
+    def __init__(self, path: str = None, flush_interval: float = None):
+        self.path = path or settings.SQLITE_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+            # Databases created before the timings column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "timings" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN timings TEXT")
+        self.writes = WriteBehindBuffer(
+            self._write_batch,
+            settings.JOB_FLUSH_INTERVAL if flush_interval is None else flush_interval,
+        )
+    
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside the writer."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, cached_statements=64)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+    
+    @staticmethod
+    def _timestamp(value: datetime) -> str:
+        # Fixed width so text order is time order
+        return value.isoformat(timespec="microseconds")
+    
+    def _row_to_dict(self, row: sqlite3.Row, outputs: List[dict]) -> dict:
+        return {
+            **dict(row),
+            "output_files": [o["path"] for o in outputs],
+            "outputs": outputs,
+        }
+    
+    def _dict_to_job(self, data: dict) -> JobResponse:
+        return JobResponse(
+            id=data["id"],
+            filename=data["filename"],
+            status=JobStatus(data["status"]),
+            total_chunks=data["total_chunks"],
+            processed_chunks=data["processed_chunks"],
+            message=data["message"],
+            output_files=data["output_files"],
+            outputs=[OutputFile(**o) for o in data["outputs"]],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            timings=json.loads(data["timings"]) if data.get("timings") else None,
+        )
+    
+    def _outputs(self, conn: sqlite3.Connection, job_id: str) -> List[dict]:
+        return [dict(row) for row in conn.execute(self.SELECT_OUTPUTS, (job_id,))]
+    
+    def _write_job(self, conn: sqlite3.Connection, update: Optional[dict],
+                   rows: List[dict]):
+        if update is not None:
+            conn.execute(self.UPDATE_JOB, update)
+        for row in rows:
+            # One at a time: seq depends on the rows inserted before it
+            conn.execute(self.INSERT_OUTPUT, row)
+    
+    def _write_batch(self, fields: Dict[str, dict],
+                     outputs: Dict[str, List[dict]]) -> List[str]:
+        """
+        Commit all buffered updates in a single transaction; if that fails,
+        job by job. Returns the ids that failed.
+        """
+        writes = {}
+        for job_id in fields.keys() | outputs.keys():
+            update = None
+            if job_id in fields:
+                update = {
+                    "id": job_id, "status": None, "total_chunks": None,
+                    "processed_chunks": None, "message": None, "timings": None,
+                    **fields[job_id],
+                }
+            rows = [{"job_id": job_id, **output} for output in outputs.get(job_id, [])]
+            writes[job_id] = (update, rows)
+        
+        conn = self._connection()
+        try:
+            with conn:
+                for update, rows in writes.values():
+                    self._write_job(conn, update, rows)
+            return []
+        except sqlite3.Error:
+            # One bad job (e.g. outputs of a deleted one) fails the whole
+            # transaction: retry one by one
+            pass
+        
+        failed = []
+        for job_id, (update, rows) in writes.items():
+            try:
+                with conn:
+                    self._write_job(conn, update, rows)
+            except sqlite3.Error:
+                if conn.execute(self.SELECT_JOB, (job_id,)).fetchone() is None:
+                    continue  # Job deleted meanwhile
+                failed.append(job_id)
+        return failed
+    
+    def create_job(self, filename: str) -> JobResponse:
+        job_id = str(uuid.uuid4())
+        job = JobResponse(
+            id=job_id,
+            filename=filename,
+            status=JobStatus.PENDING,
+            created_at=datetime.utcnow()
+        )
+        conn = self._connection()
+        with conn:
+            conn.execute(self.INSERT_JOB, {
+                "id": job.id,
+                "filename": job.filename,
+                "status": job.status.value,
+                "total_chunks": job.total_chunks,
+                "processed_chunks": job.processed_chunks,
+                "message": job.message,
+                "created_at": self._timestamp(job.created_at),
+            })
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[JobResponse]:
+        conn = self._connection()
+        row = conn.execute(self.SELECT_JOB, (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._dict_to_job(
+            self.writes.overlay(self._row_to_dict(row, self._outputs(conn, job_id)))
+        )
+    
+    def list_jobs(self, query: JobQuery = JobQuery()) -> JobPage:
+        params = {"limit": query.limit + 1}
+        if query.status is not None:
+            params["status"] = query.status.value
+        if query.created_after is not None:
+            params["created_after"] = self._timestamp(_utc_naive(query.created_after))
+        if query.created_before is not None:
+            params["created_before"] = self._timestamp(_utc_naive(query.created_before))
+        if query.cursor:
+            created_at, params["cursor_id"] = decode_cursor(query.cursor)
+            params["cursor_created_at"] = self._timestamp(created_at)
+            params["cursor"] = True
+        
+        conditions = [sql for name, sql in self.LIST_FILTERS.items() if name in params]
+        sql = "SELECT * FROM jobs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += self.LIST_ORDER
+        params.pop("cursor", None)
+        
+        conn = self._connection()
+        rows = conn.execute(sql, params).fetchall()
+        # Skip the outputs table entirely when the caller does not need it
+        with_outputs = (
+            query.fields is None or bool(query.fields & {"outputs", "output_files"})
+        )
+        jobs = [
+            self._dict_to_job(self.writes.overlay(self._row_to_dict(
+                row, self._outputs(conn, row["id"]) if with_outputs else []
+            )))
+            for row in rows[:query.limit]
+        ]
+        next_cursor = encode_cursor(jobs[-1]) if len(rows) > query.limit else None
+        return JobPage(jobs, next_cursor)
+    
+    def update_progress(self, job_id: str, processed_chunks: int,
+                        total_chunks: int = None, message: str = None):
+        updates = {"processed_chunks": processed_chunks}
+        if total_chunks is not None:
+            updates["total_chunks"] = total_chunks
+        if message:
+            updates["message"] = message
+        self.writes.update(job_id, updates)
+    
+    def set_status(self, job_id: str, status: JobStatus, message: str = None):
+        updates = {"status": status.value}
+        if message:
+            updates["message"] = message
+        self.writes.update(job_id, updates, flush_now=True)
+    
+    def add_output_file(self, job_id: str, file_path: str, audio_format: str = "wav"):
+        self.writes.add_output(job_id, {"path": file_path, "format": audio_format})
+    
+    def set_timings(self, job_id: str, timings: JobTimings):
+        self.writes.update(job_id, {"timings": timings.model_dump_json()})
+    
+    def clear_outputs(self, job_id: str):
+        def clear():
+            conn = self._connection()
+            with conn:
+                conn.execute(self.DELETE_OUTPUTS, (job_id,))
+        self.writes.clear_outputs(job_id, clear)
+    
+    def flush(self):
+        self.writes.flush()
+    
+    def close(self):
+        self.writes.close()
+    
+    def delete_job(self, job_id: str) -> bool:
+        self.writes.discard(job_id)
+        conn = self._connection()
+        with conn:
+            deleted = conn.execute(self.DELETE_JOB, (job_id,)).rowcount
+        return deleted > 0
+
+
 class InMemoryJobManager:
     """Fallback job manager that stores jobs in memory."""
     
     _jobs: Dict[str, JobResponse] = {}
+    # Jobs are written from the executor threads and read from the API
+    _lock = threading.RLock()
 
     @classmethod
     def create_job(cls, filename: str) -> JobResponse:
@@ -112,7 +668,8 @@ class InMemoryJobManager:
             status=JobStatus.PENDING,
             created_at=datetime.utcnow()
         )
-        cls._jobs[job_id] = job
+        with cls._lock:
+            cls._jobs[job_id] = job
         return job
 
     @classmethod
@@ -120,49 +677,106 @@ class InMemoryJobManager:
         return cls._jobs.get(job_id)
 
     @classmethod
-    def list_jobs(cls) -> List[JobResponse]:
-        return list(cls._jobs.values())
+    def list_jobs(cls, query: JobQuery = JobQuery()) -> JobPage:
+        created_after = _utc_naive(query.created_after)
+        created_before = _utc_naive(query.created_before)
+        after = decode_cursor(query.cursor) if query.cursor else None
+        
+        with cls._lock:
+            candidates = list(cls._jobs.values())
+        
+        jobs = []
+        for job in sorted(candidates, key=lambda j: (j.created_at, j.id), reverse=True):
+            if after is not None and (job.created_at, job.id) >= after:
+                continue
+            if query.status is not None and job.status != query.status:
+                continue
+            if created_after is not None and job.created_at < created_after:
+                continue
+            if created_before is not None and job.created_at >= created_before:
+                continue
+            jobs.append(job)
+            if len(jobs) > query.limit:
+                break
+        
+        next_cursor = None
+        if len(jobs) > query.limit:
+            next_cursor = encode_cursor(jobs[query.limit - 1])
+        return JobPage(jobs[:query.limit], next_cursor)
 
     @classmethod
     def update_progress(cls, job_id: str, processed_chunks: int, total_chunks: int = None, message: str = None):
-        if job_id in cls._jobs:
-            if total_chunks:
-                cls._jobs[job_id].total_chunks = total_chunks
-            cls._jobs[job_id].processed_chunks = processed_chunks
-            if message:
-                cls._jobs[job_id].message = message
+        with cls._lock:
+            if job_id in cls._jobs:
+                if total_chunks:
+                    cls._jobs[job_id].total_chunks = total_chunks
+                cls._jobs[job_id].processed_chunks = processed_chunks
+                if message:
+                    cls._jobs[job_id].message = message
 
     @classmethod
     def set_status(cls, job_id: str, status: JobStatus, message: str = None):
-        if job_id in cls._jobs:
-            cls._jobs[job_id].status = status
-            if message:
-                cls._jobs[job_id].message = message
+        with cls._lock:
+            if job_id in cls._jobs:
+                cls._jobs[job_id].status = status
+                if message:
+                    cls._jobs[job_id].message = message
+
+    @classmethod
+    def add_output_file(cls, job_id: str, file_path: str, audio_format: str = "wav"):
+        with cls._lock:
+            if job_id in cls._jobs:
+                # Resumed and retried jobs publish their earlier parts again
+                _apply_output(cls._jobs[job_id], file_path, audio_format)
+
+    @classmethod
+    def set_timings(cls, job_id: str, timings: JobTimings):
+        with cls._lock:
+            if job_id in cls._jobs:
+                cls._jobs[job_id].timings = timings
 
     @classmethod
-    def add_output_file(cls, job_id: str, file_path: str):
-         if job_id in cls._jobs:
-            cls._jobs[job_id].output_files.append(file_path)
+    def clear_outputs(cls, job_id: str):
+        with cls._lock:
+            if job_id in cls._jobs:
+                _clear_outputs(cls._jobs[job_id])
 
     @classmethod
     def delete_job(cls, job_id: str) -> bool:
-        if job_id in cls._jobs:
-            del cls._jobs[job_id]
-            return True
-        return False
+        with cls._lock:
+            return cls._jobs.pop(job_id, None) is not None
 
 
 # Choose the appropriate job manager based on availability and configuration
 def _get_job_manager():
-    """Factory function to get the appropriate job manager."""
-    if FIRESTORE_AVAILABLE and os.getenv("GCP_PROJECT_ID"):
+    """
+    Factory function to get the appropriate job manager.
+    
+    JOB_STORE selects the backend: "firestore", "sqlite", "memory", or
+    "auto" (Firestore when a GCP project is configured, SQLite otherwise).
+    """
+    store = settings.JOB_STORE.lower()
+    use_firestore = FIRESTORE_AVAILABLE and os.getenv("GCP_PROJECT_ID")
+    if store in ("auto", "firestore") and use_firestore:
         try:
             manager = FirestoreJobManager()
+            # Last resort if the server lifespan does not get to close it
+            atexit.register(manager.close)
             gui_logger.log("✅ Usando Firestore para persistencia de jobs")
             return manager
         except Exception as e:
             gui_logger.log(f"⚠️ Error inicializando Firestore: {e}")
-            gui_logger.log("⚠️ Usando almacenamiento en memoria")
+    if store in ("auto", "firestore", "sqlite"):
+        try:
+            manager = SQLiteJobManager()
+            atexit.register(manager.close)
+            gui_logger.log(
+                f"✅ Usando SQLite para persistencia de jobs: {manager.path}"
+            )
+            return manager
+        except Exception as e:
+            gui_logger.log(f"⚠️ Error inicializando SQLite: {e}")
+    gui_logger.log("⚠️ Usando almacenamiento en memoria")
     return InMemoryJobManager()
 
 
@@ -176,68 +790,248 @@ def get_job_manager():
     return _job_manager
 
 
+class JobCache:
+    """
+    Read-through cache for job lookups (polling endpoints).
+    
+    Single jobs and listing pages (per query) are cached separately. Writes
+    made through JobManager are applied to cached copies right away; the TTL
+    only bounds how stale changes made by other nodes can be. Callers always
+    get copies, so cached entries are never mutated outside.
+    """
+    
+    # Distinct listing queries kept at once
+    MAX_PAGES = 64
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: Dict[str, tuple] = {}
+        self._pages: Dict[JobQuery, tuple] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+    
+    def _fresh(self, fetched_at: float) -> bool:
+        return time.monotonic() - fetched_at < self.ttl
+    
+    def get(self, job_id: str) -> Optional[JobResponse]:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry and self._fresh(entry[1]):
+                return entry[0].model_copy(deep=True)
+        return None
+    
+    def put(self, job: JobResponse):
+        now = time.monotonic()
+        with self._lock:
+            self._jobs[job.id] = (job.model_copy(deep=True), now)
+            self._expire(now)
+    
+    def get_page(self, query: JobQuery) -> Optional[JobPage]:
+        with self._lock:
+            entry = self._pages.get(query)
+            if entry and self._fresh(entry[1]):
+                page = entry[0]
+                return JobPage(
+                    [job.model_copy(deep=True) for job in page.jobs],
+                    page.next_cursor,
+                )
+        return None
+    
+    def put_page(self, query: JobQuery, page: JobPage):
+        now = time.monotonic()
+        with self._lock:
+            jobs = [job.model_copy(deep=True) for job in page.jobs]
+            self._pages[query] = (JobPage(jobs, page.next_cursor), now)
+            self._expire(now)
+            while len(self._pages) > self.MAX_PAGES:
+                del self._pages[next(iter(self._pages))]
+    
+    def _expire(self, now: float):
+        for cache in (self._jobs, self._pages):
+            for key in [k for k, (_, at) in cache.items() if now - at >= self.ttl]:
+                del cache[key]
+    
+    def apply(self, job_id: str, mutate):
+        """Apply a local write to every cached copy of the job."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry:
+                mutate(entry[0])
+            for page, _ in self._pages.values():
+                for job in page.jobs:
+                    if job.id == job_id:
+                        mutate(job)
+    
+    def invalidate(self, job_id: str = None):
+        """Drop a job (if given) and every listing, whose membership may change."""
+        with self._lock:
+            if job_id is not None:
+                self._jobs.pop(job_id, None)
+            self._pages.clear()
+
+
+def _apply_fields(job: JobResponse, fields: dict):
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def _apply_output(job: JobResponse, file_path: str, audio_format: str):
+    if file_path not in job.output_files:
+        job.output_files.append(file_path)
+        job.outputs.append(OutputFile(path=file_path, format=audio_format))
+
+
+def _clear_outputs(job: JobResponse):
+    job.output_files = []
+    job.outputs = []
+
+
+def _store_timer(operation: str):
+    return metrics.job_store_seconds.labels(operation=operation).time()
+
+
 # Backwards-compatible class that delegates to the appropriate manager
 class JobManager:
-    _callback = None
+    _cache = JobCache(settings.JOB_CACHE_TTL)
 
     @classmethod
     def register_callback(cls, callback):
-        cls._callback = callback
+        """Receive every job event on a background thread (used by the GUI)."""
+        return event_bus.add_listener(callback, name="gui")
 
     @classmethod
     def _notify(cls, job_id: str, event_type: str, data: dict):
-        if cls._callback:
-            try:
-                cls._callback(job_id, event_type, data)
-            except Exception as e:
-                # Avoid crashing if UI fails
-                print(f"UI Callback error: {e}")
+        event_bus.publish(job_id, event_type, data)
 
     @classmethod
     def create_job(cls, filename: str) -> JobResponse:
-        job = get_job_manager().create_job(filename)
+        with _store_timer("create"):
+            job = get_job_manager().create_job(filename)
+        cls._cache.invalidate()
         cls._notify(job.id, "created", {"filename": job.filename, "status": job.status.value})
         return job
 
     @classmethod
     def get_job(cls, job_id: str) -> Optional[JobResponse]:
-        return get_job_manager().get_job(job_id)
+        if not cls._cache.enabled:
+            with _store_timer("get"):
+                return get_job_manager().get_job(job_id)
+        job = cls._cache.get(job_id)
+        if job is not None:
+            metrics.job_cache_lookups.labels(result="hit").inc()
+            return job
+        metrics.job_cache_lookups.labels(result="miss").inc()
+        with _store_timer("get"):
+            job = get_job_manager().get_job(job_id)
+        if job is not None:
+            cls._cache.put(job)
+        return job
 
     @classmethod
-    def list_jobs(cls) -> List[JobResponse]:
-        return get_job_manager().list_jobs()
+    def list_jobs(cls, limit: int = 50, cursor: str = None, status: JobStatus = None,
+                  created_after: datetime = None, created_before: datetime = None,
+                  fields: List[str] = None) -> JobPage:
+        """
+        One page of jobs, newest first. Pass `next_cursor` back as `cursor`
+        for the following page. With `fields`, backends may leave the other
+        fields at their defaults.
+        """
+        query = JobQuery(
+            limit, cursor, status, created_after, created_before,
+            frozenset(fields) if fields is not None else None,
+        )
+        if not cls._cache.enabled:
+            with _store_timer("list"):
+                return get_job_manager().list_jobs(query)
+        page = cls._cache.get_page(query)
+        if page is not None:
+            metrics.job_cache_lookups.labels(result="hit").inc()
+            return page
+        metrics.job_cache_lookups.labels(result="miss").inc()
+        with _store_timer("list"):
+            page = get_job_manager().list_jobs(query)
+        cls._cache.put_page(query, page)
+        return page
 
     @classmethod
     def update_progress(cls, job_id: str, processed_chunks: int, total_chunks: int = None, message: str = None):
-        result = get_job_manager().update_progress(job_id, processed_chunks, total_chunks, message)
+        with _store_timer("update_progress"):
+            result = get_job_manager().update_progress(
+                job_id, processed_chunks, total_chunks, message
+            )
         
         data = {"processed_chunks": processed_chunks}
         if total_chunks is not None:
             data["total_chunks"] = total_chunks
         if message:
             data["message"] = message
+        cls._cache.apply(job_id, lambda job: _apply_fields(job, data))
             
         cls._notify(job_id, "progress", data)
         return result
 
     @classmethod
     def set_status(cls, job_id: str, status: JobStatus, message: str = None):
-        result = get_job_manager().set_status(job_id, status, message)
+        with _store_timer("set_status"):
+            result = get_job_manager().set_status(job_id, status, message)
+        if status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+            metrics.jobs_finished.labels(status=status.value).inc()
         
         data = {"status": status.value}
         if message:
             data["message"] = message
+        cls._cache.apply(
+            job_id, lambda job: _apply_fields(job, {**data, "status": status})
+        )
+        # The job may move in or out of status-filtered listings
+        cls._cache.invalidate()
             
         cls._notify(job_id, "status_change", data)
         return result
 
     @classmethod
-    def add_output_file(cls, job_id: str, file_path: str):
-        result = get_job_manager().add_output_file(job_id, file_path)
-        cls._notify(job_id, "new_file", {"file_path": file_path})
+    def add_output_file(cls, job_id: str, file_path: str, audio_format: str = "wav"):
+        with _store_timer("add_output"):
+            result = get_job_manager().add_output_file(job_id, file_path, audio_format)
+        cls._cache.apply(
+            job_id, lambda job: _apply_output(job, file_path, audio_format)
+        )
+        cls._notify(
+            job_id, "new_file", {"file_path": file_path, "format": audio_format}
+        )
+        return result
+
+    @classmethod
+    def set_timings(cls, job_id: str, timings: JobTimings):
+        """Store the job's timing breakdown (written with the next flush)."""
+        with _store_timer("set_timings"):
+            result = get_job_manager().set_timings(job_id, timings)
+        cls._cache.apply(job_id, lambda job: _apply_fields(job, {"timings": timings}))
+        return result
+
+    @classmethod
+    def clear_outputs(cls, job_id: str):
+        """Forget the job's audio parts (written right away, not buffered)."""
+        with _store_timer("clear_outputs"):
+            result = get_job_manager().clear_outputs(job_id)
+        cls._cache.apply(job_id, _clear_outputs)
         return result
 
     @classmethod
     def delete_job(cls, job_id: str) -> bool:
-        return get_job_manager().delete_job(job_id)
+        cls._cache.invalidate(job_id)
+        with _store_timer("delete"):
+            deleted = get_job_manager().delete_job(job_id)
+        if deleted:
+            cls._notify(job_id, "deleted", {})
+        return deleted
+
+    @classmethod
+    def shutdown(cls):
+        """Write out buffered updates (Firestore) before the process exits."""
+        if _job_manager is not None and hasattr(_job_manager, "close"):
+            _job_manager.close()
 
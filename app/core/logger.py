@@ -1,19 +1,136 @@
+import sys
+import json
+import time
+import atexit
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple
+from app.core.config import settings
+
+
+class LogRecord(NamedTuple):
+    seq: int
+    time: float
+    message: str
+    thread: str
+
+
+Sink = Callable[[List[LogRecord]], None]
+
+
+def stdout_sink(records: List[LogRecord]):
+    sys.stdout.write("".join(f"[NO-GUI-LOG] {record.message}\n" for record in records))
+    sys.stdout.flush()
+
+
+class JsonFileSink:
+    """Appends records as JSON lines, for log shippers."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, records: List[LogRecord]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps({
+                    "seq": record.seq,
+                    "ts": record.time,
+                    "thread": record.thread,
+                    "message": record.message,
+                }, ensure_ascii=False) + "\n")
+
+
 class GuiLogger:
+    """
+    Process-wide log fan-out.
+
+    `log()` only appends to in-memory deques, so worker threads never wait
+    on the GUI or on I/O. A background thread hands the pending records to
+    the sinks in batches, at most once per LOG_FLUSH_INTERVAL. The last
+    LOG_BUFFER_SIZE records stay in a ring buffer (`recent()`); if sinks
+    fall that far behind, the oldest pending records are dropped.
+    """
     _instance = None
-    _callback = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(GuiLogger, cls).__new__(cls)
+            cls._instance._setup()
         return cls._instance
 
-    def set_callback(self, callback):
-        self._callback = callback
+    def _setup(self):
+        self._seq = itertools.count(1)
+        self._recent: Deque[LogRecord] = deque(maxlen=settings.LOG_BUFFER_SIZE)
+        self._pending: Deque[LogRecord] = deque(maxlen=settings.LOG_BUFFER_SIZE)
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._sinks: Dict[str, Sink] = {"stdout": stdout_sink}
+        if settings.LOG_JSON_PATH:
+            self._sinks["json"] = JsonFileSink(settings.LOG_JSON_PATH)
+        self._wake = threading.Event()
+        self._deliver_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="log-delivery", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def set_callback(self, callback: Sink):
+        """Send batches to the GUI instead of stdout."""
+        self._sinks.pop("stdout", None)
+        self.add_sink("gui", callback)
+
+    def add_sink(self, name: str, sink: Sink):
+        self._sinks[name] = sink
+
+    def remove_sink(self, name: str):
+        self._sinks.pop(name, None)
 
     def log(self, message: str):
-        if self._callback:
-            self._callback(message)
-        else:
-            print(f"[NO-GUI-LOG] {message}")
+        record = LogRecord(
+            next(self._seq), time.time(), message, threading.current_thread().name
+        )
+        self._recent.append(record)
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append(record)
+        if not self._wake.is_set():
+            self._wake.set()
+
+    def recent(self, limit: int = None) -> List[LogRecord]:
+        records = list(self._recent)
+        return records[-limit:] if limit else records
+
+    def flush(self):
+        """Deliver whatever is pending now (shutdown, tests)."""
+        with self._deliver_lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return
+            if self.dropped > self._reported_dropped:
+                lost = self.dropped - self._reported_dropped
+                self._reported_dropped = self.dropped
+                notice = f"⚠️ {lost} mensajes de log descartados (sinks lentos)"
+                batch.insert(0, LogRecord(0, time.time(), notice, "log-delivery"))
+            for name, sink in list(self._sinks.items()):
+                try:
+                    sink(batch)
+                except Exception as e:
+                    # Never log from here: a broken sink would feed itself
+                    sys.stderr.write(f"Log sink {name} failed: {e}\n")
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            started = time.monotonic()
+            self.flush()
+            # Cap the refresh rate; records logged meanwhile go in the next batch
+            elapsed = time.monotonic() - started
+            time.sleep(max(0.0, settings.LOG_FLUSH_INTERVAL - elapsed))
+
 
 gui_logger = GuiLogger()
@@ -0,0 +1,262 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Minimal Prometheus-style metrics (text exposition format 0.0.4), so the
+# node needs no extra dependency. Updates are a dict lookup plus a short
+# lock, cheap enough to leave on; gauges that mirror existing state are
+# read at scrape time through collectors instead of being kept in sync.
+
+Sample = Tuple[str, Dict[str, str], float]
+# (name, type, help, samples) of one metric family
+Family = Tuple[str, str, str, Iterable[Sample]]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RATIO_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+BYTES_BUCKETS = (16e3, 64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def samples(self) -> Iterable[Sample]:
+        for key, child in list(self._children.items()):
+            yield from child.samples(self.name, dict(zip(self.labelnames, key)))
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        yield f"{name}_total", labels, self.value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float("inf")), counts):
+            cumulative += count
+            yield f"{name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield f"{name}_sum", labels, total
+        yield f"{name}_count", labels, cumulative
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+class MetricsRegistry:
+    """Metrics defined below plus collectors called at scrape time."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Family]]):
+        """`collector()` yields (name, type, help, samples) for each metric family."""
+        self._collectors.append(collector)
+
+    def _families(self):
+        for metric in self._metrics:
+            yield metric.name, metric.type, metric.help, metric.samples()
+        for collector in self._collectors:
+            yield from collector()
+
+    def render(self) -> str:
+        lines = []
+        for name, kind, help, samples in self._families():
+            if kind == "counter" and not name.endswith("_total"):
+                # Format 0.0.4 types the family by its sample name (as
+                # prometheus_client does)
+                name += "_total"
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(
+                    f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+process_start_time = registry.register(Gauge(
+    "fognode_process_start_time_seconds",
+    "Start time of the process since the Unix epoch.",
+))
+process_start_time.set(time.time())
+
+# Synthesis
+piper_synthesis_seconds = registry.register(Histogram(
+    "fognode_piper_synthesis_seconds",
+    "Piper time to render one chunk (cache misses only).",
+    buckets=SLOW_BUCKETS,
+))
+piper_real_time_factor = registry.register(Histogram(
+    "fognode_piper_real_time_factor", "Synthesis seconds per second of audio produced.",
+    buckets=RATIO_BUCKETS,
+))
+piper_audio_seconds = registry.register(Counter(
+    "fognode_piper_audio_seconds", "Seconds of audio rendered by Piper.",
+))
+chunks = registry.register(Counter(
+    "fognode_chunks", "Book chunks finished, by result (done, failed, reused).",
+    ["result"],
+))
+
+# Extraction
+extraction_seconds = registry.register(Histogram(
+    "fognode_extraction_seconds", "Time spent extracting the text of one book.",
+    ["format"],
+    buckets=SLOW_BUCKETS,
+))
+
+# Uploads
+upload_seconds = registry.register(Histogram(
+    "fognode_upload_seconds", "Cloud Storage upload latency per file.", ["method"],
+    buckets=SLOW_BUCKETS,
+))
+upload_bytes = registry.register(Histogram(
+    "fognode_upload_bytes", "Size of uploaded files.", buckets=BYTES_BUCKETS,
+))
+upload_errors = registry.register(Counter(
+    "fognode_upload_errors", "Failed upload attempts (before retries).",
+))
+
+# Jobs
+job_store_seconds = registry.register(Histogram(
+    "fognode_job_store_seconds",
+    "Job store operation latency; flush is the batched write of buffered updates.",
+    ["operation"],
+))
+job_store_write_failures = registry.register(Counter(
+    "fognode_job_store_write_failures",
+    "Buffered job writes that failed and were queued again.",
+))
+job_cache_lookups = registry.register(Counter(
+    "fognode_job_cache_lookups", "Job cache lookups, by result (hit, miss).",
+    ["result"],
+))
+jobs_finished = registry.register(Counter(
+    "fognode_jobs_finished", "Jobs that reached a final status.", ["status"],
+))
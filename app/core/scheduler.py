@@ -0,0 +1,144 @@
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.logger import gui_logger
+
+
+class QueueFullError(Exception):
+    """Raised when the node already has MAX_QUEUED_JOBS books waiting."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """
+    Admission control for book jobs.
+
+    At most `max_concurrent` jobs run at once; the rest wait in a priority
+    queue (higher priority first, FIFO within a priority). Once `max_queued`
+    jobs are waiting, new submissions are rejected instead of piling up.
+    Runs on the event loop; not thread-safe.
+    """
+
+    # Retry-After when no job has finished yet to estimate from
+    DEFAULT_JOB_SECONDS = 60
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self._queue: List[tuple] = []
+        self._queued: Dict[str, tuple] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._counter = itertools.count()
+        # Moving average of job durations, for Retry-After
+        self._avg_seconds: Optional[float] = None
+
+    @property
+    def is_full(self) -> bool:
+        return (
+            len(self._running) >= self.max_concurrent
+            and len(self._queued) >= self.max_queued
+        )
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queue slot frees up."""
+        per_job = self._avg_seconds or self.DEFAULT_JOB_SECONDS
+        return max(1, int(per_job / max(self.max_concurrent, 1)))
+
+    def submit(self, job_id: str, run: Callable[[], Awaitable],
+               priority: int = 0) -> int:
+        """
+        Start `run()` now or queue it. Returns the queue position
+        (0 = started right away); raises QueueFullError.
+        """
+        if len(self._running) < self.max_concurrent and not self._queue:
+            self._start(job_id, run)
+            return 0
+        if len(self._queued) >= self.max_queued:
+            raise QueueFullError(self.retry_after())
+
+        entry = (-priority, next(self._counter), job_id, run)
+        heapq.heappush(self._queue, entry)
+        self._queued[job_id] = entry
+        return self.queue_position(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position among waiting jobs, None if not waiting."""
+        entry = self._queued.get(job_id)
+        if entry is None:
+            return None
+        return 1 + sum(1 for other in self._queued.values() if other[:2] < entry[:2])
+
+    def positions(self) -> Dict[str, int]:
+        """Queue position of every waiting job; safe to call from the GUI thread."""
+        entries = sorted(list(self._queued.values()), key=lambda entry: entry[:2])
+        return {entry[2]: position for position, entry in enumerate(entries, 1)}
+
+    def remove(self, job_id: str) -> bool:
+        """Drop a job that has not started yet."""
+        entry = self._queued.pop(job_id, None)
+        if entry is None:
+            return False
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+        return True
+
+    def is_running(self, job_id: str) -> bool:
+        return job_id in self._running
+
+    def cancel(self, job_id: str) -> Optional[asyncio.Task]:
+        """
+        Cancel a running job's task; returns it so the caller can await the
+        cleanup.
+        """
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return task
+
+    def _start(self, job_id: str, run: Callable[[], Awaitable]):
+        started = time.monotonic()
+        task = asyncio.ensure_future(run())
+        self._running[job_id] = task
+        task.add_done_callback(lambda _: self._finished(job_id, started))
+
+    def _finished(self, job_id: str, started: float):
+        self._running.pop(job_id, None)
+        elapsed = time.monotonic() - started
+        if self._avg_seconds is None:
+            self._avg_seconds = elapsed
+        else:
+            self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and len(self._running) < self.max_concurrent:
+            _, _, job_id, run = heapq.heappop(self._queue)
+            del self._queued[job_id]
+            gui_logger.log(f"▶️ Iniciando job en cola: {job_id}")
+            self._start(job_id, run)
+
+    async def shutdown(self):
+        """Forget queued jobs and cancel running ones."""
+        self._queue.clear()
+        self._queued.clear()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+        }
+
+
+job_scheduler = JobScheduler(settings.MAX_CONCURRENT_JOBS, settings.MAX_QUEUED_JOBS)
@@ -0,0 +1,262 @@
+import time
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import flet as ft
+from app.core.config import settings
+from app.core.scheduler import job_scheduler
+from app.services.upload_queue import upload_queue
+
+FINAL_STATUSES = {"completed", "failed", "cancelled"}
+STATUS_COLORS = {
+    "pending": "blue",
+    "processing": "orange",
+    "completed": "green",
+    "failed": "red",
+    "cancelled": "grey",
+}
+# Finished jobs kept on screen (newest first) once they leave the active list
+MAX_FINISHED_CARDS = 10
+# Seconds of progress history used for throughput and ETA
+THROUGHPUT_WINDOW = 60
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class JobState:
+    """What the dashboard knows about a job, built from its events only."""
+    __slots__ = (
+        "filename", "status", "processed", "total", "message", "samples",
+        "finished_at",
+    )
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.status = "pending"
+        self.processed = 0
+        self.total: Optional[int] = None
+        self.message = ""
+        self.samples: Deque[Tuple[float, int]] = deque()
+        self.finished_at: Optional[float] = None
+
+    def record_progress(self, processed: int):
+        now = time.monotonic()
+        self.processed = processed
+        self.samples.append((now, processed))
+        while len(self.samples) > 2 and now - self.samples[0][0] > THROUGHPUT_WINDOW:
+            self.samples.popleft()
+
+    def throughput(self) -> Optional[float]:
+        """Chunks per minute over the recent window."""
+        if len(self.samples) < 2:
+            return None
+        # Between samples, so a card only changes when progress is reported
+        (t0, p0), (t1, p1) = self.samples[0], self.samples[-1]
+        elapsed = t1 - t0
+        if elapsed <= 0 or p1 <= p0:
+            return None
+        return (p1 - p0) * 60 / elapsed
+
+
+class JobCard:
+    """Controls of one job; `render` only touches the ones whose value changed."""
+
+    def __init__(self):
+        self.title = ft.Text("", size=14, weight="bold")
+        self.status = ft.Text("", size=12, color="grey")
+        self.progress = ft.ProgressBar(value=0, color="blue")
+        self.details = ft.Text("", size=12, italic=True)
+        self.control = ft.Container(
+            content=ft.Column([
+                ft.Row([ft.Icon(ft.Icons.DESCRIPTION), self.title]),
+                self.progress,
+                ft.Row([
+                    self.status,
+                    ft.Container(expand=True),  # Spacer
+                    self.details,
+                ]),
+            ], spacing=4),
+            bgcolor="#252525",
+            padding=10,
+            border_radius=10,
+        )
+        self._fields = {
+            "title": (self.title, "value"),
+            "status": (self.status, "value"),
+            "progress": (self.progress, "value"),
+            "color": (self.progress, "color"),
+            "details": (self.details, "value"),
+        }
+
+    def render(self, view: dict) -> List[ft.Control]:
+        changed = []
+        for name, value in view.items():
+            control, attr = self._fields[name]
+            if getattr(control, attr) != value:
+                setattr(control, attr, value)
+                if control not in changed:
+                    changed.append(control)
+        return changed
+
+
+class JobDashboard:
+    """
+    One card per active job (plus the last few finished ones).
+
+    Job events only update in-memory state under a lock, so the threads
+    publishing them never touch Flet. A refresh thread redraws at most
+    GUI_REFRESH_FPS times per second, sending only the controls whose
+    value changed since the previous frame.
+    """
+
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self.summary = ft.Text("Sin jobs", size=12, color="grey")
+        self.cards_view = ft.ListView(expand=1, spacing=8, padding=5)
+        self.control = ft.Column([
+            ft.Text("JOBS", size=12, weight="bold", color="blue"),
+            self.summary,
+            self.cards_view,
+        ], expand=True)
+        self._jobs: Dict[str, JobState] = {}
+        self._cards: Dict[str, JobCard] = {}
+        self._lock = threading.Lock()
+        self._layout_dirty = False
+        self._thread: Optional[threading.Thread] = None
+
+    def on_job_event(self, job_id: str, event_type: str, data: dict):
+        with self._lock:
+            if event_type == "deleted":
+                if self._jobs.pop(job_id, None) is not None:
+                    self._layout_dirty = True
+                return
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = JobState(data.get("filename", job_id[:8]))
+                self._layout_dirty = True
+
+            if event_type == "progress":
+                job.record_progress(data.get("processed_chunks", job.processed))
+                if data.get("total_chunks"):
+                    job.total = data["total_chunks"]
+            elif event_type == "status_change":
+                job.status = data.get("status", job.status)
+                if job.status in FINAL_STATUSES:
+                    job.finished_at = time.monotonic()
+                    self._layout_dirty = True
+                elif job.finished_at is not None:
+                    # Retried
+                    job.finished_at = None
+                    job.samples.clear()
+                    self._layout_dirty = True
+            if data.get("message"):
+                job.message = data["message"]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="gui-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        interval = 1 / max(settings.GUI_REFRESH_FPS, 0.1)
+        while True:
+            started = time.monotonic()
+            try:
+                self._frame()
+            except Exception as e:
+                # Page closed or a transient Flet error: try again next frame
+                print(f"Dashboard refresh error: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    def _view(self, job: JobState, position: Optional[int]) -> dict:
+        details = []
+        if job.total:
+            details.append(f"Chunks: {job.processed} / {job.total}")
+            progress = min(job.processed / job.total, 1)
+        else:
+            details.append(f"Chunks: {job.processed}")
+            progress = None if job.status == "processing" else 0
+
+        if job.status == "completed":
+            progress = 1
+        elif job.status == "processing":
+            rate = job.throughput()
+            if rate:
+                details.append(f"{rate:.1f} chunks/min")
+                if job.total and job.total > job.processed:
+                    eta = (job.total - job.processed) * 60 / rate
+                    details.append(f"ETA {_format_duration(eta)}")
+        elif position is not None:
+            details.append(f"En cola: #{position}")
+
+        status = job.status
+        if job.message:
+            status += f" - {job.message}"
+        return {
+            "title": job.filename,
+            "status": status,
+            "progress": progress,
+            "color": STATUS_COLORS.get(job.status, "blue"),
+            "details": " · ".join(details),
+        }
+
+    def _frame(self):
+        positions = job_scheduler.positions()
+        with self._lock:
+            active = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is None
+            ]
+            finished = sorted(
+                (
+                    job_id for job_id, job in self._jobs.items()
+                    if job.finished_at is not None
+                ),
+                key=lambda job_id: self._jobs[job_id].finished_at,
+                reverse=True,
+            )
+            # Forget finished jobs that scrolled off
+            for job_id in finished[MAX_FINISHED_CARDS:]:
+                del self._jobs[job_id]
+            shown = active + finished[:MAX_FINISHED_CARDS]
+            views = {
+                job_id: self._view(self._jobs[job_id], positions.get(job_id))
+                for job_id in shown
+            }
+            layout_dirty, self._layout_dirty = self._layout_dirty, False
+
+        changed: List[ft.Control] = []
+        for job_id, view in views.items():
+            card = self._cards.get(job_id)
+            if card is None:
+                card = self._cards[job_id] = JobCard()
+            changed += card.render(view)
+        for job_id in set(self._cards) - set(views):
+            del self._cards[job_id]
+
+        stats = job_scheduler.stats()
+        summary = (
+            f"En curso: {stats['running']}/{stats['max_concurrent']} · "
+            f"En cola: {stats['queued']}/{stats['max_queued']} · "
+            f"Subidas pendientes: {upload_queue.stats()['waiting']}"
+        )
+        if summary != self.summary.value:
+            self.summary.value = summary
+            changed.append(self.summary)
+
+        if layout_dirty:
+            # Cards were added, removed or moved: resend the list (it
+            # includes the cards)
+            self.cards_view.controls = [self._cards[job_id].control for job_id in views]
+            changed = [self.summary, self.cards_view]
+        if changed:
+            self.page.update(*changed)
@@ -3,17 +3,15 @@ import flet as ft
 from app.core.config import settings
 from app.core.logger import gui_logger
 from app.core.jobs import JobManager  # Import JobManager
+from app.gui.dashboard import JobDashboard
 from app.api.server import run_server
 
 def main_gui(page: ft.Page):
     page.title = "Fog Node Manager (Linux)"
     page.theme_mode = ft.ThemeMode.DARK
     page.window_width = 700
-    page.window_height = 600
+    page.window_height = 800
     
-    # --- State ---
-    current_job_id = [None]  # List to be mutable in closure
-
     # --- Components ---
     
     # 1. Status Header
@@ -22,28 +20,12 @@ def main_gui(page: ft.Page):
         bgcolor="red", padding=10, border_radius=5
     )
 
-    # 2. Job Status Panel
-    job_filename = ft.Text("Esperando archivo...", size=16, weight="bold")
-    job_progress_bar = ft.ProgressBar(width=400, value=0, color="orange")
-    job_status_text = ft.Text("No job running", size=12, color="grey")
-    job_details_text = ft.Text("-", size=12, italic=True)
-    
-    job_panel = ft.Container(
-        content=ft.Column([
-            ft.Text("PROCESAMIENTO ACTUAL", size=12, weight="bold", color="blue"),
-            ft.Divider(height=5, color="transparent"),
-            ft.Row([ft.Icon(ft.Icons.DESCRIPTION), job_filename]),
-            job_progress_bar,
-            ft.Row([
-                job_status_text,
-                ft.Container(expand=True), # Spacer
-                job_details_text
-            ])
-        ]),
-        bgcolor="#252525",
-        padding=15,
-        border_radius=10,
-        visible=False # Hidden initially
+    # 2. Jobs Dashboard (one card per active job)
+    dashboard = JobDashboard(page)
+    dashboard_container = ft.Container(
+        content=dashboard.control,
+        padding=10,
+        expand=2,
     )
 
     # 3. Logs
@@ -58,67 +40,24 @@ def main_gui(page: ft.Page):
 
     # --- Callbacks ---
 
-    # Log Callback
-    def add_log(msg):
-        logs_view.controls.append(
-            ft.Text(f"> {msg}", font_family="Monospace", size=12)
+    # Log Callback: one batch per refresh from the logger thread
+    def add_log(records):
+        logs_view.controls.extend(
+            ft.Text(f"> {record.message}", font_family="Monospace", size=12)
+            for record in records[-settings.GUI_LOG_LINES:]
         )
+        # Only the most recent lines stay on screen
+        del logs_view.controls[:-settings.GUI_LOG_LINES]
         try:
-            page.update()
+            page.update(logs_view)
         except:
             pass 
 
     gui_logger.set_callback(add_log)
 
-    # Job Callback
-    def on_job_update(job_id, event_type, data):
-        # Always make panel visible on update
-        job_panel.visible = True
-        current_job_id[0] = job_id
-        
-        if event_type == "created":
-            job_filename.value = data.get("filename", "Unknown")
-            job_progress_bar.value = 0
-            job_status_text.value = f"Status: {data.get('status', 'PENDING')}"
-            job_details_text.value = "Iniciando..."
-            
-        elif event_type == "progress":
-            processed = data.get("processed_chunks", 0)
-            total = data.get("total_chunks")
-            
-            if total and total > 0:
-                job_progress_bar.value = processed / total
-                job_details_text.value = f"Chunks: {processed} / {total}"
-            else:
-                job_progress_bar.value = None # Indeterminate
-                job_details_text.value = f"Chunks processed: {processed}"
-            
-            if data.get("message"):
-                job_status_text.value = data["message"]
-
-        elif event_type == "status_change":
-            status = data.get("status")
-            job_status_text.value = f"Status: {status}"
-            if data.get("message"):
-                job_status_text.value += f" - {data['message']}"
-            
-            if status == "completed":
-                job_progress_bar.value = 1
-                job_progress_bar.color = "green"
-            elif status == "failed":
-                job_progress_bar.color = "red"
-                
-        elif event_type == "new_file":
-            # Optional: Show last generated file?
-            pass
-
-        try:
-            page.update()
-        except:
-            pass
-
-    # Register the callback hook
-    JobManager.register_callback(on_job_update)
+    # Job events only update dashboard state; it redraws on its own thread
+    JobManager.register_callback(dashboard.on_job_event)
+    dashboard.start()
 
 
     def start_service(e):
@@ -150,7 +89,7 @@ def main_gui(page: ft.Page):
             status_indicator
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
         ft.Divider(),
-        job_panel, 
+        dashboard_container,
         ft.Text("Logs del Sistema", size=12, color="grey"),
         logs_container,
         ft.Container(content=btn_start, padding=10)
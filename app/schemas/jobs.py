@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -8,6 +8,39 @@ class JobStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class OutputFile(BaseModel):
+    path: str
+    format: str = "wav"
+
+class StageTiming(BaseModel):
+    """
+    Totals of one pipeline stage (extraction, chunking, synthesis, encode,
+    upload, job_store, checkpoint).
+    """
+    count: int = 0
+    wall_seconds: float = 0.0
+    # CPU of the node's threads, plus the Piper process for synthesis
+    cpu_seconds: float = 0.0
+    chars: int = 0
+    audio_seconds: float = 0.0
+    bytes: int = 0
+
+class ChunkTiming(BaseModel):
+    part: int
+    chars: int = 0
+    audio_seconds: float = 0.0
+    bytes: int = 0
+    # Seconds per stage, retries included
+    wall_seconds: Dict[str, float] = {}
+    cpu_seconds: Dict[str, float] = {}
+
+class JobTimings(BaseModel):
+    # Time spent in processing runs (a resumed job adds up its runs)
+    wall_seconds: float = 0.0
+    stages: Dict[str, StageTiming] = {}
+    chunks: List[ChunkTiming] = []
 
 class JobBase(BaseModel):
     filename: str
@@ -23,6 +56,12 @@ class JobCreate(JobBase):
 class JobResponse(JobBase):
     id: str
     output_files: List[str] = []
+    # Same files as output_files, with the audio format of each
+    outputs: List[OutputFile] = []
+    # 1-based position in this node's job queue while waiting to start
+    queue_position: Optional[int] = None
+    # Per-stage timing breakdown; only with GET /jobs/{id}?detail=true
+    timings: Optional[JobTimings] = None
 
     class Config:
         from_attributes = True
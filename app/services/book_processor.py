@@ -1,125 +1,652 @@
 import os
-import io
+import math
+import time
 import asyncio
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Set
+from app.core.config import settings
+from app.core.executors import (
+    synthesis_executor, encoder_executor, io_executor, extraction_executor,
+    get_pdf_process_pool, run_in, run_in_settled,
+)
 from app.core.jobs import JobManager, JobStatus
 from app.services.piper import PiperService
+from app.services.piper_pool import piper_pool, SynthesisCancelledError
+from app.services.upload_queue import upload_queue
 from app.services.storage import StorageService
+from app.services.checkpoint import JobCheckpoint, ENCODED, DONE, FAILED
+from app.services.timings import JobTimer
+from app.schemas.jobs import JobTimings
+from app.core.scheduler import job_scheduler, QueueFullError
+from app.services.spool import SpoolService
+from app.services.encoder import AudioEncoder
+from app.services.pdf_extraction import extract_page_range
+from app.services.epub_extraction import iter_epub_chapters
+from app.services.chunking import Chunk, ChunkingConfig, TextChunker
 from app.core.logger import gui_logger
+from app.core import metrics
 import pypdf
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
+
+class TextBlock(NamedTuple):
+    """A piece of extracted text plus how far through the source file it ends (0..1)."""
+    text: str
+    progress: float
+    # True when the block starts a new chapter; the chunker never packs across it
+    chapter_start: bool = False
+
 
 class BookProcessor:
+    # Jobs being cancelled (event loop only)
+    _cancelled: Set[str] = set()
+    # Timers of the jobs being processed, for live timing views
+    _timers: Dict[str, JobTimer] = {}
+
     @staticmethod
-    def extract_text_from_pdf(file_content: bytes) -> str:
-        text = ""
-        with io.BytesIO(file_content) as f:
+    def iter_pdf_pages(file_path: str) -> Iterator[TextBlock]:
+        # pypdf reads objects lazily from the open spool file
+        with open(file_path, "rb") as f:
             reader = pypdf.PdfReader(f)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+            total_pages = len(reader.pages)
+            if total_pages < settings.PDF_PARALLEL_MIN_PAGES:
+                for i, page in enumerate(reader.pages):
+                    yield TextBlock(page.extract_text() or "", (i + 1) / total_pages)
+                return
+        yield from BookProcessor.iter_pdf_pages_parallel(file_path, total_pages)
 
     @staticmethod
-    def extract_text_from_epub(file_content: bytes) -> str:
-        # Save bytes to temporary file because ebooklib needs a path
-        # Or use BytesIO if library supports it (ebooklib read_epub usually takes path)
-        # We'll write to a temp file for safety
-        import tempfile
+    def iter_pdf_pages_parallel(file_path: str,
+                                total_pages: int) -> Iterator[TextBlock]:
+        """
+        Split the page range across the PDF process pool. Each worker opens
+        the spooled file itself; results are yielded back in page order.
+        Only a bounded number of ranges run ahead of the consumer.
+        """
+        pool = get_pdf_process_pool()
+        step = max(1, settings.PDF_PAGES_PER_TASK)
+        ranges = [
+            (start, min(start + step, total_pages))
+            for start in range(0, total_pages, step)
+        ]
+        max_ahead = settings.PDF_EXTRACTION_PROCESSES * 2
+        pending = deque()
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".epub") as tmp:
-            tmp.write(file_content)
-            tmp_path = tmp.name
-            
         try:
-            book = epub.read_epub(tmp_path)
-            text = []
-            for item in book.get_items():
-                if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                    soup = BeautifulSoup(item.get_content(), 'html.parser')
-                    text.append(soup.get_text())
-            return "\n".join(text)
+            for start, stop in ranges:
+                future = pool.submit(extract_page_range, file_path, start, stop)
+                pending.append((stop, future))
+                if len(pending) < max_ahead:
+                    continue
+                yield from BookProcessor._drain_page_range(
+                    pending.popleft(), total_pages
+                )
+            while pending:
+                yield from BookProcessor._drain_page_range(
+                    pending.popleft(), total_pages
+                )
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _drain_page_range(item, total_pages: int) -> Iterator[TextBlock]:
+        stop, future = item
+        pages = future.result()
+        first = stop - len(pages)
+        for offset, text in enumerate(pages):
+            yield TextBlock(text, (first + offset + 1) / total_pages)
+
+    @staticmethod
+    def iter_epub_documents(file_path: str) -> Iterator[TextBlock]:
+        # One spine document per chapter, in reading order
+        for text, progress in iter_epub_chapters(file_path):
+            yield TextBlock(text, progress, chapter_start=True)
+
+    @staticmethod
+    def iter_txt_lines(file_path: str) -> Iterator[TextBlock]:
+        total_bytes = os.path.getsize(file_path) or 1
+        consumed = 0
+        with open(file_path, "rb") as f:
+            for raw in f:
+                consumed += len(raw)
+                yield TextBlock(raw.decode("utf-8"), consumed / total_bytes)
+
+    @staticmethod
+    def iter_blocks(file_path: str, filename: str) -> Iterator[TextBlock]:
+        if filename.lower().endswith('.pdf'):
+            return BookProcessor.iter_pdf_pages(file_path)
+        elif filename.lower().endswith('.epub'):
+            return BookProcessor.iter_epub_documents(file_path)
+        # Default to text
+        return BookProcessor.iter_txt_lines(file_path)
+
+    @staticmethod
+    def iter_chunks(blocks: Iterable[TextBlock],
+                    config: Optional[ChunkingConfig] = None) -> Iterator[Chunk]:
+        """
+        Streaming chunker: packs paragraphs into chunks as blocks arrive, so
+        only the chunk being built is held in memory.
+        """
+        chunker = TextChunker(config)
+        for block in blocks:
+            # Keep audio parts aligned with chapters
+            if block.chapter_start:
+                yield from chunker.chapter_break()
+            # Split by paragraphs for better audiobook results
+            for p in block.text.split('\n'):
+                yield from chunker.add_paragraph(p, block.progress)
+        yield from chunker.flush()
+
+    @staticmethod
+    def timed(items: Iterator, totals: dict,
+              chars: Callable[[object], int]) -> Iterator:
+        """
+        Add the wall and CPU time spent producing each item (not waiting on
+        consumers) and its characters to `totals`.
+        """
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            item = next(items, None)
+            totals["seconds"] += time.perf_counter() - wall
+            totals["cpu"] += time.thread_time() - cpu
+            if item is None:
+                return
+            totals["chars"] += chars(item)
+            yield item
+
+    @staticmethod
+    def produce_chunks(file_path: str, filename: str, queue: asyncio.Queue,
+                       loop: asyncio.AbstractEventLoop, stop: threading.Event,
+                       timer: Optional[JobTimer] = None):
+        """
+        Runs on the extraction executor and feeds chunks to process_book as
+        soon as they are ready. Blocks while the queue is full (backpressure).
+        """
+        extraction = {"seconds": 0.0, "cpu": 0.0, "chars": 0}
+        produced = {"seconds": 0.0, "cpu": 0.0, "chars": 0}
+        blocks = BookProcessor.timed(
+            BookProcessor.iter_blocks(file_path, filename),
+            extraction, lambda b: len(b.text),
+        )
+        chunks = BookProcessor.timed(
+            BookProcessor.iter_chunks(blocks), produced, lambda c: c.chars
+        )
+        try:
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put(chunk), loop).result()
+            extension = os.path.splitext(filename)[1].lower().lstrip(".")
+            if extension not in ("pdf", "epub"):
+                extension = "txt"
+            metrics.extraction_seconds.labels(format=extension).observe(
+                extraction["seconds"]
+            )
         finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            if timer is not None:
+                # Blocks are extracted while chunks are being built:
+                # chunking is the rest
+                timer.record(
+                    "extraction", extraction["seconds"], extraction["cpu"],
+                    chars=extraction["chars"],
+                )
+                timer.record(
+                    "chunking", produced["seconds"] - extraction["seconds"],
+                    produced["cpu"] - extraction["cpu"], chars=produced["chars"],
+                )
+            if not stop.is_set():
+                asyncio.run_coroutine_threadsafe(queue.put(None), loop).result()
 
     @staticmethod
-    async def process_book(job_id: str, file_content: bytes, filename: str):
+    async def submit_upload(job_id: str, full_path: str, audio_format: str,
+                            timer: Optional[JobTimer] = None, part: int = None,
+                            cancelled: Optional[threading.Event] = None,
+                            ) -> asyncio.Future:
         """
-        Background task to process the uploaded book.
+        Queue a rendered chunk for upload (waits while the upload queue is
+        full). The future resolves to the GCS URI; without a bucket it is
+        the local path. Nothing more is uploaded once `cancelled` is set.
         """
-        JobManager.set_status(job_id, JobStatus.PROCESSING, "Reading file...")
+        if not settings.BUCKET_NAME:
+            done = asyncio.get_running_loop().create_future()
+            done.set_result(full_path)
+            return done
         
+        chunk_filename = os.path.basename(full_path)
+        # 2. Upload to Cloud Storage (Fog Computing: storage in cloud)
+        # 3. Store GCS URI as source of truth (not local path)
+        # This ensures persistence even if fog node restarts
+        span = None
+        if timer is not None:
+            def span():
+                return timer.span("upload", part, bytes=os.path.getsize(full_path))
+        return await upload_queue.submit(
+            full_path, f"audiobooks/{job_id}/{chunk_filename}",
+            AudioEncoder.content_type(audio_format), span, cancelled,
+        )
+
+    @staticmethod
+    def output_exists(output: str) -> bool:
+        """Whether a recorded chunk output is still there (bucket or disk)."""
+        if not output.startswith("gs://"):
+            return os.path.exists(output)
         try:
-            text = ""
-            if filename.lower().endswith('.pdf'):
-                text = BookProcessor.extract_text_from_pdf(file_content)
-            elif filename.lower().endswith('.epub'):
-                text = BookProcessor.extract_text_from_epub(file_content)
+            return StorageService.exists(output)
+        except Exception as e:
+            # Cannot tell: render the part again rather than risk a hole
+            gui_logger.log(f"⚠️ No se pudo comprobar {output}: {e}")
+            return False
+
+    @staticmethod
+    def synthesize_chunk(timer: JobTimer, part: int, text: str,
+                         chunk_filename: str, job_id: str) -> str:
+        # Drop Piper CPU left over from a failed request on this thread
+        piper_pool.take_cpu_seconds()
+        with timer.span("synthesis", part, chars=len(text)) as span:
+            wav_path = PiperService.synthesize(text, chunk_filename, job_id)
+            # Piper renders in its own process: charge its CPU to this span
+            span.cpu_seconds = piper_pool.take_cpu_seconds()
+            span.audio_seconds = PiperService.wav_seconds(wav_path)
+        return wav_path
+
+    @staticmethod
+    def encode_chunk(timer: JobTimer, part: int, wav_path: str,
+                     audio_format: str) -> str:
+        with timer.span("encode", part) as span:
+            output_path = AudioEncoder.encode(wav_path, audio_format)
+            span.bytes = os.path.getsize(output_path)
+        return output_path
+
+    @staticmethod
+    async def render_chunk(job_id: str, text: str, chunk_filename: str,
+                           audio_format: str, timer: JobTimer, part: int,
+                           cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Synthesize and encode one chunk, retrying up to CHUNK_MAX_RETRIES
+        times. Cancelled after `cancelled` is set, it returns only once
+        Piper and ffmpeg stopped writing.
+        """
+        attempt = 0
+        while True:
+            try:
+                # 1. Generate Audio locally (Fog Computing: processing at edge)
+                wav_path = await run_in_settled(
+                    synthesis_executor, cancelled, BookProcessor.synthesize_chunk,
+                    timer, part, text, chunk_filename, job_id,
+                )
+                # Encode on its own pool so the synthesis slot is free for
+                # the next chunk
+                return await run_in_settled(
+                    encoder_executor, cancelled, BookProcessor.encode_chunk,
+                    timer, part, wav_path, audio_format,
+                )
+            except SynthesisCancelledError:
+                raise
+            except Exception as e:
+                if attempt >= settings.CHUNK_MAX_RETRIES:
+                    raise
+                attempt += 1
+                gui_logger.log(
+                    f"🔁 Reintento {attempt}/{settings.CHUNK_MAX_RETRIES} de "
+                    f"{chunk_filename}: {e}"
+                )
+
+    @staticmethod
+    async def process_book(job_id: str, file_path: str, filename: str):
+        """
+        Background task to process the uploaded book from its spool file.
+        
+        Every blocking step (parsing, Piper, GCS, job store) runs on a
+        dedicated executor so the API stays responsive while books render.
+        Progress is checkpointed per chunk: a resumed job skips the chunks
+        already produced, and chunks that still fail after their retries
+        leave the job FAILED (retryable) instead of COMPLETED with holes.
+        Stage timings are recorded on the job as it runs (see JobTimer).
+        """
+        job = await run_in(io_executor, JobManager.get_job, job_id)
+        timer = BookProcessor._timers[job_id] = JobTimer(job.timings if job else None)
+        # Set when the job is cancelled (not on shutdown): every step stops
+        # early, and the cleanup waits for the ones already running
+        cancelled = threading.Event()
+        
+        async def store(func, *args):
+            return await run_in_settled(
+                io_executor, cancelled, timer.wrap("job_store", func), *args
+            )
+        
+        checkpoint = await run_in(io_executor, JobCheckpoint.load, job_id)
+        if checkpoint is None:
+            checkpoint = JobCheckpoint(job_id, filename, file_path)
+        resuming = bool(checkpoint.chunks)
+        await store(
+            JobManager.set_status, job_id, JobStatus.PROCESSING,
+            "Resuming..." if resuming else "Reading file...",
+        )
+        
+        loop = asyncio.get_running_loop()
+        # Small queue: extraction only runs a little ahead of synthesis
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.SYNTHESIS_WORKERS + 1)
+        in_flight = asyncio.Semaphore(settings.SYNTHESIS_WORKERS * 2)
+        stop = threading.Event()
+        producer = loop.run_in_executor(
+            extraction_executor, BookProcessor.produce_chunks,
+            file_path, filename, queue, loop, stop, timer,
+        )
+        
+        finished = {}
+        uploads = set()
+        publish_lock = asyncio.Lock()
+        state = {"next_index": 0, "completed": 0, "total": 0, "chars": 0, "skipped": 0}
+        
+        async def publish(index: int, output: Optional[str]):
+            # Publish outputs in part order as soon as the prefix is contiguous
+            async with publish_lock:
+                finished[index] = output
+                state["completed"] += 1
+                while state["next_index"] in finished:
+                    output = finished.pop(state["next_index"])
+                    if output:
+                        await store(
+                            JobManager.add_output_file, job_id, output, audio_format
+                        )
+                    state["next_index"] += 1
+                await store(
+                    JobManager.update_progress, job_id,
+                    state["completed"], state["total"],
+                )
+        
+        async def stop_producer():
+            stop.set()
+            # Unblock the producer if it is waiting on a full queue
+            while not producer.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.05)
+        
+        async def checkpoint_chunk(index: int, text: str, chunk_state: str,
+                                   output: str = None, error: str = None):
+            checkpoint.mark(index, text, audio_format, chunk_state, output, error)
+            if chunk_state in (DONE, FAILED):
+                metrics.chunks.labels(result=chunk_state).inc()
+            await run_in_settled(
+                io_executor, cancelled, timer.wrap("checkpoint", checkpoint.save)
+            )
+        
+        async def start_chunk(index: int, chunk: str) -> asyncio.Future:
+            """
+            Render the chunk (or reuse it from the checkpoint) and hand it
+            to the upload stage.
+            """
+            chunk_filename = f"{job_id}_part_{index+1:03d}.wav"
+            previous = checkpoint.finished_output(index, chunk, audio_format)
+            if previous and await run_in(
+                io_executor, BookProcessor.output_exists, previous["output"]
+            ):
+                state["skipped"] += 1
+                metrics.chunks.labels(result="reused").inc()
+                if previous["state"] == DONE:
+                    # Already produced before the restart. Published again
+                    # (stores skip known paths) in case the store lost it
+                    done = loop.create_future()
+                    done.set_result(previous["output"])
+                    return done
+                full_path = previous["output"]
             else:
-                # Default to text
-                text = file_content.decode("utf-8")
-            
-            # Simple chunking by newlines or max chars
-            # For better audiobook results, we should split by paragraphs
-            paragraphs = [p.strip() for p in text.split('\n') if p.strip()]
-            
-            # Group paragraphs into larger chunks (e.g., 25,000 chars ~ 30-40 mins)
-            # This reduces the number of files significantly as requested.
-            TARGET_CHUNK_SIZE = 25000 
-            chunks = []
-            current_chunk = ""
+                full_path = await BookProcessor.render_chunk(
+                    job_id, chunk, chunk_filename, audio_format, timer,
+                    index + 1, cancelled,
+                )
+                await checkpoint_chunk(index, chunk, ENCODED, full_path)
+            # Hand over to the upload stage; only blocks while its queue is full
+            upload = await BookProcessor.submit_upload(
+                job_id, full_path, audio_format, timer, index + 1, cancelled
+            )
+            uploads.add(upload)
+            upload.add_done_callback(uploads.discard)
+            return upload
+        
+        async def run_chunk(index: int, chunk: str):
+            output = None
+            upload = None
+            try:
+                upload = await start_chunk(index, chunk)
+            except Exception as e:
+                gui_logger.log(f"❌ Error en el chunk {index + 1}: {e}")
+                await checkpoint_chunk(index, chunk, FAILED, error=str(e))
+            finally:
+                in_flight.release()
             
-            for p in paragraphs:
-                if len(current_chunk) + len(p) < TARGET_CHUNK_SIZE:
-                    current_chunk += "\n" + p
-                else:
-                    if current_chunk:
-                        chunks.append(current_chunk.strip())
-                    current_chunk = p
+            # Only confirmed uploads become outputs
+            if upload is not None:
+                try:
+                    output = await upload
+                    await checkpoint_chunk(index, chunk, DONE, output)
+                except Exception as e:
+                    gui_logger.log(
+                        f"❌ Error subiendo la parte {index + 1}, "
+                        f"se conserva el archivo local: {e}"
+                    )
+                    await checkpoint_chunk(index, chunk, FAILED, error=str(e))
+            await publish(index, output)
+        
+        tasks = []
+        try:
+            audio_format = AudioEncoder.output_format()
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                index = chunk.index
+                
+                # total_chunks is an estimate until extraction completes:
+                # remaining text (extrapolated from read progress) in target-size chunks
+                state["chars"] += chunk.chars
+                remaining = 0
+                if chunk.progress:
+                    remaining = state["chars"] / chunk.progress - state["chars"]
+                estimate = index + 1 + math.ceil(
+                    remaining / settings.CHUNK_TARGET_CHARS
+                )
+                if estimate != state["total"]:
+                    state["total"] = estimate
+                    message = "Starting audio generation..." if index == 0 else None
+                    await store(
+                        JobManager.update_progress, job_id,
+                        state["completed"], estimate, message,
+                    )
+                
+                gui_logger.log(f"🧩 Chunk {index + 1}: {chunk.chars} caracteres")
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(run_chunk(index, chunk.text)))
             
-            if current_chunk:
-                chunks.append(current_chunk.strip())
+            # Surface extraction errors
+            await producer
+            state["total"] = len(tasks)
+            await store(
+                JobManager.update_progress, job_id,
+                state["completed"], state["total"],
+            )
+            await asyncio.gather(*tasks)
             
-            JobManager.update_progress(job_id, 0, len(chunks), "Starting audio generation...")
+            failed = checkpoint.failed_chunks()
+            if failed:
+                # Keep the spool file and checkpoint so the failed parts can be retried
+                parts = ", ".join(str(i + 1) for i in failed)
+                await store(
+                    JobManager.set_status, job_id, JobStatus.FAILED,
+                    f"{len(failed)} of {state['total']} parts failed ({parts}); "
+                    "retry to render only those.",
+                )
+                return
             
-            generated_files = []
+            message = "All chunks processed."
+            if state["skipped"]:
+                message += f" {state['skipped']} reused from a previous run."
+            await store(JobManager.set_status, job_id, JobStatus.COMPLETED, message)
+            BookProcessor.discard_source(checkpoint)
             
-            for i, chunk in enumerate(chunks):
-                if not chunk: continue
-                
-                chunk_filename = f"{job_id}_part_{i+1:03d}.wav"
-                
-                # Check status to allow cancellation (future feature)
-                
+        except Exception as e:
+            await stop_producer()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await store(JobManager.set_status, job_id, JobStatus.FAILED, str(e))
+            # Possibly transient (job store, bucket): keep the spool file and
+            # checkpoint so a retry resumes. Deleting the job removes them.
+        except asyncio.CancelledError:
+            stop.set()
+            if job_id in BookProcessor._cancelled:
+                cancelled.set()
+            producer.add_done_callback(lambda f: f.cancelled() or f.exception())
+            # Chunk tasks and their uploads are not children of this task:
+            # stop them too.
+            # On cancel this waits for the synthesis, encode and upload calls
+            # already running, so no part is written after the cleanup below.
+            for pending in [*tasks, *uploads]:
+                pending.cancel()
+            await asyncio.gather(*tasks, *uploads, return_exceptions=True)
+            if not cancelled.is_set():
+                # Node shutting down: keep spool file and checkpoint to
+                # resume on startup
+                raise
+            await stop_producer()
+            await BookProcessor._finish_cancel(job_id, checkpoint)
+        finally:
+            BookProcessor._timers.pop(job_id, None)
+            # Buffered like progress; readers see it right away
+            JobManager.set_timings(job_id, timer.snapshot())
+
+    @staticmethod
+    def live_timings(job_id: str) -> Optional[JobTimings]:
+        """Timings so far of a job being processed right now."""
+        timer = BookProcessor._timers.get(job_id)
+        return timer.snapshot() if timer else None
+
+    @staticmethod
+    def remove_outputs(job_id: str):
+        """Delete the job's audio parts, locally and in the bucket."""
+        prefix = f"{job_id}_part_"
+        for entry in os.scandir(settings.AUDIO_OUTPUT_DIR):
+            if entry.name.startswith(prefix):
                 try:
-                    # 1. Generate Audio locally (Fog Computing: processing at edge)
-                    full_path = PiperService.synthesize(chunk, chunk_filename)
-                    
-                    # 2. Upload to Cloud Storage (Fog Computing: storage in cloud)
-                    cloud_uri = StorageService.upload_file(full_path, f"audiobooks/{job_id}/{chunk_filename}")
-                    
-                    # 3. Store GCS URI as source of truth (not local path)
-                    # This ensures persistence even if fog node restarts
-                    if cloud_uri and not cloud_uri.startswith("error"):
-                        JobManager.add_output_file(job_id, cloud_uri)
-                        generated_files.append(cloud_uri)
-                    else:
-                        # Fallback: use local path if upload failed
-                        gui_logger.log(f"⚠️ Upload falló, usando ruta local: {full_path}")
-                        JobManager.add_output_file(job_id, full_path)
-                        generated_files.append(full_path)
-                    
-                except Exception as e:
-                    print(f"Error processing chunk {i}: {e}")
-                    # Continue with other chunks or fail hard? 
-                    # For now log and continue
-                
-                JobManager.update_progress(job_id, i + 1)
-                # Small yield to not block event loop totally if synchronous
-                await asyncio.sleep(0.1) 
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+        if settings.BUCKET_NAME:
+            try:
+                StorageService.delete_prefix(f"audiobooks/{job_id}/")
+            except Exception as e:
+                gui_logger.log(
+                    f"⚠️ No se pudieron borrar las partes de {job_id} en GCS: {e}"
+                )
 
-            JobManager.set_status(job_id, JobStatus.COMPLETED, "All chunks processed.")
-            
-        except Exception as e:
-            JobManager.set_status(job_id, JobStatus.FAILED, str(e))
+    @staticmethod
+    async def _finish_cancel(job_id: str, checkpoint: Optional[JobCheckpoint]):
+        # Unlink the parts from the job before they are deleted
+        await run_in(io_executor, JobManager.clear_outputs, job_id)
+        await run_in(io_executor, BookProcessor.remove_outputs, job_id)
+        if checkpoint is not None:
+            BookProcessor.discard_source(checkpoint)
+        await run_in(
+            io_executor, JobManager.set_status, job_id,
+            JobStatus.CANCELLED, "Cancelled by user.",
+        )
+        BookProcessor._cancelled.discard(job_id)
+        piper_pool.forget_job(job_id)
+        gui_logger.log(f"🛑 Job cancelado: {job_id}")
+
+    @staticmethod
+    async def cancel(job_id: str) -> bool:
+        """
+        Cancel a queued or running job: no new chunks are scheduled, its
+        running Piper processes are killed and its parts are removed.
+        Returns False if the job already finished.
+        """
+        if job_scheduler.is_running(job_id):
+            BookProcessor._cancelled.add(job_id)
+            killed = piper_pool.cancel_job(job_id)
+            gui_logger.log(f"🛑 Cancelando {job_id}: {killed} procesos Piper detenidos")
+            task = job_scheduler.cancel(job_id)
+            # process_book cleans up when it sees the cancellation
+            await asyncio.gather(task, return_exceptions=True)
+            if job_id not in BookProcessor._cancelled:
+                return True
+            # Stopped before process_book reached its main loop, or it had
+            # already returned
+        
+        # Nothing is running and, once out of the queue, nothing will start:
+        # only now is the status final enough to decide on
+        job_scheduler.remove(job_id)
+        job = await run_in(io_executor, JobManager.get_job, job_id)
+        if job is None or job.status in (JobStatus.COMPLETED, JobStatus.CANCELLED):
+            BookProcessor._cancelled.discard(job_id)
+            piper_pool.forget_job(job_id)
+            return False
+        # Queued, failed or orphaned: clean up here
+        checkpoint = await run_in(io_executor, JobCheckpoint.load, job_id)
+        await BookProcessor._finish_cancel(job_id, checkpoint)
+        return True
+
+    @staticmethod
+    def discard_source(checkpoint: JobCheckpoint):
+        SpoolService.remove(checkpoint.source_path)
+        checkpoint.remove()
+
+    @staticmethod
+    def schedule(job_id: str, file_path: str, filename: str, priority: int = 0) -> int:
+        """Queue a job on the scheduler; returns its queue position (0 = started)."""
+        return job_scheduler.submit(
+            job_id, lambda: BookProcessor.process_book(job_id, file_path, filename),
+            priority,
+        )
+
+    @staticmethod
+    async def resume_interrupted():
+        """
+        Called on startup: re-queue jobs that were pending or processing when
+        the node stopped. Their chunks already produced are skipped.
+        """
+        for job_id in await run_in(io_executor, JobCheckpoint.list_job_ids):
+            checkpoint = await run_in(io_executor, JobCheckpoint.load, job_id)
+            if checkpoint is None:
+                continue
+            job = await run_in(io_executor, JobManager.get_job, job_id)
+            if job is None or job.status == JobStatus.COMPLETED:
+                BookProcessor.discard_source(checkpoint)
+                continue
+            if job.status != JobStatus.PENDING and job.status != JobStatus.PROCESSING:
+                # Failed jobs wait for an explicit retry
+                continue
+            if not os.path.exists(checkpoint.source_path):
+                await run_in(
+                    io_executor, JobManager.set_status, job_id, JobStatus.FAILED,
+                    "Source file lost during restart; upload the book again.",
+                )
+                checkpoint.remove()
+                continue
+            try:
+                BookProcessor.schedule(
+                    job_id, checkpoint.source_path, checkpoint.filename
+                )
+                gui_logger.log(
+                    f"♻️ Reanudando job interrumpido: {job_id} "
+                    f"({checkpoint.filename})"
+                )
+            except QueueFullError:
+                gui_logger.log(
+                    f"⚠️ Cola llena, el job {job_id} se reanudará en el próximo "
+                    "arranque"
+                )
+
+    @staticmethod
+    async def retry(job_id: str) -> bool:
+        """
+        Re-queue a FAILED job from its checkpoint; only failed parts are
+        rendered again.
+        """
+        checkpoint = await run_in(io_executor, JobCheckpoint.load, job_id)
+        if checkpoint is None or not os.path.exists(checkpoint.source_path):
+            return False
+        # Raises QueueFullError with the job still FAILED (and retryable)
+        BookProcessor.schedule(job_id, checkpoint.source_path, checkpoint.filename)
+        # Not awaited, so it is in before process_book runs and sets PROCESSING
+        JobManager.set_status(job_id, JobStatus.PENDING, "Queued for retry")
+        return True
@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.core.logger import gui_logger
+
+# Chunk states: rendered locally (upload pending), done (output recorded) or failed
+ENCODED = "encoded"
+DONE = "done"
+FAILED = "failed"
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class JobCheckpoint:
+    """
+    On-disk progress of one book job: `CHECKPOINT_DIR/<job_id>.json`.
+
+    Records the source file and, per chunk, a digest of its text, its state
+    and its output. Chunking is deterministic, so after a restart the book
+    is re-chunked and any chunk whose digest and format match a finished
+    entry is skipped. Saves are atomic (temp file + rename).
+    """
+
+    def __init__(self, job_id: str, filename: str, source_path: str,
+                 chunks: Optional[Dict[str, dict]] = None):
+        self.job_id = job_id
+        self.filename = filename
+        self.source_path = source_path
+        self.chunks: Dict[str, dict] = chunks or {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written = 0
+
+    @staticmethod
+    def path_for(job_id: str) -> str:
+        return os.path.join(settings.CHECKPOINT_DIR, f"{job_id}.json")
+
+    @classmethod
+    def create(cls, job_id: str, filename: str, source_path: str) -> "JobCheckpoint":
+        checkpoint = cls(job_id, filename, source_path)
+        checkpoint.save()
+        return checkpoint
+
+    @classmethod
+    def load(cls, job_id: str) -> Optional["JobCheckpoint"]:
+        try:
+            with open(cls.path_for(job_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            gui_logger.log(f"⚠️ Checkpoint ilegible para {job_id}: {e}")
+            return None
+        return cls(
+            data["job_id"], data["filename"], data["source_path"], data.get("chunks")
+        )
+
+    @classmethod
+    def list_job_ids(cls) -> List[str]:
+        if not os.path.isdir(settings.CHECKPOINT_DIR):
+            return []
+        return [
+            name[:-len(".json")]
+            for name in os.listdir(settings.CHECKPOINT_DIR)
+            if name.endswith(".json")
+        ]
+
+    def finished_output(self, index: int, text: str,
+                        audio_format: str) -> Optional[dict]:
+        """The entry of a chunk already rendered from this same text, if any."""
+        with self._lock:
+            entry = self.chunks.get(str(index))
+        if not entry or entry["state"] not in (ENCODED, DONE):
+            return None
+        if entry["digest"] != text_digest(text) or entry["format"] != audio_format:
+            return None
+        return dict(entry)
+
+    def mark(self, index: int, text: str, audio_format: str, state: str,
+             output: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            self.chunks[str(index)] = {
+                "digest": text_digest(text),
+                "chars": len(text),
+                "format": audio_format,
+                "state": state,
+                "output": output,
+                "error": error,
+            }
+            self._version += 1
+
+    def failed_chunks(self) -> List[int]:
+        with self._lock:
+            return sorted(
+                int(i) for i, entry in self.chunks.items() if entry["state"] == FAILED
+            )
+
+    def save(self):
+        with self._lock:
+            version = self._version
+            payload = json.dumps({
+                "job_id": self.job_id,
+                "filename": self.filename,
+                "source_path": self.source_path,
+                "chunks": self.chunks,
+            })
+        # Saves may finish out of order on the executor; never let an older one win
+        with self._write_lock:
+            if version < self._written:
+                return
+            os.makedirs(settings.CHECKPOINT_DIR, exist_ok=True)
+            path = self.path_for(self.job_id)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._written = version
+
+    def remove(self):
+        try:
+            os.remove(self.path_for(self.job_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,174 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, List, NamedTuple, Optional
+from app.core.config import settings
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then
+# whitespace before something that can start a sentence (Spanish ¿¡ included).
+SENTENCE_BOUNDARY = re.compile(
+    r'(?<=[.!?…])["\'»”’)\]]*\s+'
+    r'(?=["\'«“‘(\[¿¡]*[A-ZÁÉÍÓÚÑÜ0-9])'
+)
+
+# Abbreviations that end in a period but do not end a sentence
+ABBREVIATIONS = {
+    "sr", "sra", "srta", "dr", "dra", "d", "dña", "ud", "uds", "lic", "ing",
+    "prof", "etc", "pág", "cap", "vol", "núm", "no", "art", "fig", "ej",
+    "mr", "mrs", "ms", "st", "vs", "p", "pp",
+}
+
+
+@dataclass
+class ChunkingConfig:
+    """Chunk size limits, in characters."""
+    min_chars: int = 5000
+    target_chars: int = 25000
+    max_chars: int = 30000
+    # Size of the first chunk (0 = same as target) for fast time to first audio
+    first_chars: int = 0
+
+    @classmethod
+    def from_settings(cls) -> "ChunkingConfig":
+        return cls(
+            min_chars=settings.CHUNK_MIN_CHARS,
+            target_chars=settings.CHUNK_TARGET_CHARS,
+            max_chars=settings.CHUNK_MAX_CHARS,
+            first_chars=settings.CHUNK_FIRST_CHARS,
+        )
+
+
+class Chunk(NamedTuple):
+    index: int
+    text: str
+    chars: int
+    # How far through the source the chunk ends (0..1), for progress estimates
+    progress: float = 1.0
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a paragraph into sentences, keeping abbreviations together."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        head = text[start:match.start()].rstrip("\"'»”’)]")
+        last_word = head.rsplit(None, 1)[-1] if head.split() else ""
+        if (last_word.rstrip(".").lower() in ABBREVIATIONS
+                or re.fullmatch(r"[A-ZÁÉÍÓÚÑ]\.", last_word)):
+            continue
+        sentences.append(text[start:match.start()].strip())
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return [s for s in sentences if s]
+
+
+def _hard_split(sentence: str, max_chars: int) -> Iterator[str]:
+    """Last resort for a sentence longer than max_chars: cut at whitespace."""
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        yield sentence[:cut].strip()
+        sentence = sentence[cut:].strip()
+    if sentence:
+        yield sentence
+
+
+class TextChunker:
+    """
+    Streaming, sentence-aware chunker.
+
+    Paragraphs are packed up to `target_chars`; a paragraph that does not fit
+    is split at sentence boundaries instead of being carried whole into the
+    next chunk. Chunks below `min_chars` keep growing up to `max_chars`, and
+    `chapter_break()` always closes the current chunk.
+    """
+
+    def __init__(self, config: Optional[ChunkingConfig] = None):
+        self.config = config or ChunkingConfig.from_settings()
+        self.chunk_sizes: List[int] = []
+        self._parts: List[str] = []
+        self._length = 0
+        self._progress = 0.0
+
+    def _limits(self):
+        target = self.config.target_chars
+        min_chars = self.config.min_chars
+        if not self.chunk_sizes and self.config.first_chars > 0:
+            target = self.config.first_chars
+            min_chars = min(min_chars, target)
+        return min_chars, target, self.config.max_chars
+
+    def _append(self, text: str, separator: str):
+        if self._parts:
+            self._parts.append(separator)
+            self._length += len(separator)
+        self._parts.append(text)
+        self._length += len(text)
+
+    def _emit(self) -> Optional[Chunk]:
+        if not self._parts:
+            return None
+        text = "".join(self._parts).strip()
+        self._parts = []
+        self._length = 0
+        if not text:
+            return None
+        chunk = Chunk(len(self.chunk_sizes), text, len(text), self._progress)
+        self.chunk_sizes.append(chunk.chars)
+        return chunk
+
+    def _add_piece(self, text: str, separator: str) -> Iterator[Chunk]:
+        min_chars, target, max_chars = self._limits()
+        size = self._length + len(separator) + len(text)
+        if self._parts and size > target and (
+            self._length >= min_chars or size > max_chars
+        ):
+            chunk = self._emit()
+            if chunk:
+                yield chunk
+        self._append(text, separator)
+
+    def add_paragraph(self, paragraph: str,
+                      progress: Optional[float] = None) -> Iterator[Chunk]:
+        paragraph = paragraph.strip()
+        if not paragraph:
+            return
+        if progress is not None:
+            self._progress = progress
+
+        min_chars, target, _ = self._limits()
+        fits_here = self._length + 1 + len(paragraph) <= target
+        fits_next = (
+            len(paragraph) <= self.config.target_chars and self._length >= min_chars
+        )
+        if fits_here or fits_next:
+            yield from self._add_piece(paragraph, "\n")
+            return
+
+        # Paragraph does not fit: continue it sentence by sentence
+        separator = "\n"
+        for sentence in split_sentences(paragraph):
+            for piece in _hard_split(sentence, self.config.max_chars):
+                yield from self._add_piece(piece, separator)
+                separator = " "
+
+    def chapter_break(self) -> Iterator[Chunk]:
+        chunk = self._emit()
+        if chunk:
+            yield chunk
+
+    def flush(self) -> Iterator[Chunk]:
+        self._progress = 1.0
+        yield from self.chapter_break()
+
+
+def chunk_text(text: str, config: Optional[ChunkingConfig] = None) -> List[Chunk]:
+    """Chunk a whole text in one go (paragraphs are separated by newlines)."""
+    chunker = TextChunker(config)
+    chunks = []
+    for paragraph in text.split("\n"):
+        chunks.extend(chunker.add_paragraph(paragraph))
+    chunks.extend(chunker.flush())
+    return chunks
@@ -0,0 +1,78 @@
+import os
+import subprocess
+from typing import List, Optional
+from app.core.config import settings
+from app.core.logger import gui_logger
+
+# Output formats: file extension, MIME type and ffmpeg codec arguments.
+# "opus" is the low-bitrate speech codec (VoIP tuning, mono).
+FORMATS = {
+    "wav": {"ext": ".wav", "content_type": "audio/wav", "args": None},
+    "flac": {
+        "ext": ".flac", "content_type": "audio/flac",
+        "args": ["-c:a", "flac", "-compression_level", "5"],
+    },
+    "opus": {
+        "ext": ".opus", "content_type": "audio/ogg",
+        "args": ["-c:a", "libopus", "-application", "voip", "-ac", "1"],
+    },
+}
+
+
+class AudioEncoder:
+    """Converts Piper's WAV output to the configured AUDIO_FORMAT with ffmpeg."""
+
+    @staticmethod
+    def output_format(requested: Optional[str] = None) -> str:
+        fmt = (requested or settings.AUDIO_FORMAT).lower()
+        if fmt not in FORMATS:
+            raise ValueError(
+                f"Unsupported audio format: {fmt} (use {', '.join(FORMATS)})"
+            )
+        return fmt
+
+    @staticmethod
+    def content_type(fmt: str) -> str:
+        return FORMATS[fmt]["content_type"]
+
+    @staticmethod
+    def _command(wav_path: str, output_path: str, fmt: str) -> List[str]:
+        cmd = [
+            settings.FFMPEG_BIN_PATH, "-nostdin", "-y", "-loglevel", "error",
+            "-i", wav_path,
+        ]
+        cmd += FORMATS[fmt]["args"]
+        if fmt == "opus":
+            cmd += ["-b:a", settings.OPUS_BITRATE]
+        cmd.append(output_path)
+        return cmd
+
+    @staticmethod
+    def encode(wav_path: str, fmt: Optional[str] = None) -> str:
+        """
+        Encode `wav_path` next to itself and remove the WAV.
+        Returns the path of the encoded file (the WAV itself for "wav").
+        """
+        fmt = AudioEncoder.output_format(fmt)
+        if fmt == "wav":
+            return wav_path
+
+        output_path = os.path.splitext(wav_path)[0] + FORMATS[fmt]["ext"]
+        try:
+            subprocess.run(
+                AudioEncoder._command(wav_path, output_path, fmt),
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode("utf-8", "replace").strip()
+            error_msg = f"Error en ffmpeg ({fmt}): {stderr}"
+            gui_logger.log(f"❌ {error_msg}")
+            raise Exception(error_msg)
+
+        before = os.path.getsize(wav_path)
+        after = os.path.getsize(output_path)
+        os.remove(wav_path)
+        gui_logger.log(f"🗜️ {os.path.basename(output_path)}: {before} → {after} bytes")
+        return output_path
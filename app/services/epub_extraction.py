@@ -0,0 +1,105 @@
+import zipfile
+import posixpath
+from collections import deque
+from typing import Iterator, List, Tuple
+from xml.etree import ElementTree
+from urllib.parse import unquote
+from app.core.config import settings
+from app.core.executors import parse_executor
+
+# lxml parses much faster than html.parser and releases the GIL while it
+# works, so chapters can be parsed on threads. Fall back if it is missing.
+try:
+    import lxml.html
+    from lxml.etree import ParserError
+    LXML_AVAILABLE = True
+except ImportError:
+    from bs4 import BeautifulSoup
+    LXML_AVAILABLE = False
+
+CONTAINER_PATH = "META-INF/container.xml"
+NS = {
+    "container": "urn:oasis:names:tc:opendocument:xmlns:container",
+    "opf": "http://www.idpf.org/2007/opf",
+}
+DOCUMENT_TYPES = ("application/xhtml+xml", "text/html")
+# Elements that end a paragraph: the chunker splits on the newlines added here
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "tr", "blockquote", "section", "article",
+    "h1", "h2", "h3", "h4", "h5", "h6", "pre", "dd", "dt",
+}
+
+
+def _spine_paths(book: zipfile.ZipFile) -> List[str]:
+    """Resolve the reading order (spine) to paths inside the zip."""
+    container = ElementTree.fromstring(book.read(CONTAINER_PATH))
+    rootfile = container.find(".//container:rootfile", NS)
+    opf_path = rootfile.get("full-path")
+    opf_dir = posixpath.dirname(opf_path)
+
+    package = ElementTree.fromstring(book.read(opf_path))
+    manifest = {
+        item.get("id"): item
+        for item in package.findall("opf:manifest/opf:item", NS)
+    }
+
+    paths = []
+    for itemref in package.findall("opf:spine/opf:itemref", NS):
+        if itemref.get("linear") == "no":
+            continue
+        item = manifest.get(itemref.get("idref"))
+        if item is None or item.get("media-type") not in DOCUMENT_TYPES:
+            continue
+        href = unquote(item.get("href").split("#", 1)[0])
+        paths.append(posixpath.normpath(posixpath.join(opf_dir, href)))
+    return paths
+
+
+def html_to_text(content: bytes) -> str:
+    """Visible text of an XHTML chapter with one paragraph per line."""
+    if not content.strip():
+        return ""
+    if not LXML_AVAILABLE:
+        return BeautifulSoup(content, "html.parser").get_text()
+
+    try:
+        root = lxml.html.document_fromstring(content)
+    except ParserError:
+        # No elements at all (only an XML declaration or a comment)
+        return ""
+    for element in list(root.iter("script", "style", "head")):
+        element.drop_tree()
+    for element in root.iter(*BLOCK_TAGS):
+        element.tail = "\n" + (element.tail or "")
+    return root.text_content()
+
+
+def iter_epub_chapters(file_path: str) -> Iterator[Tuple[str, float]]:
+    """
+    Yield (chapter text, fraction of the spine done) in spine order.
+
+    The spooled EPUB is read as a zip directly (no ebooklib temp-file round
+    trip, only the members being parsed are held in memory). Raw chapters
+    are read sequentially from the archive and parsed ahead in parallel on
+    the parse executor.
+    """
+    with zipfile.ZipFile(file_path) as book:
+        names = set(book.namelist())
+        paths = [p for p in _spine_paths(book) if p in names]
+        max_ahead = settings.EPUB_PARSE_WORKERS * 2
+        pending = deque()
+
+        done = 0
+        try:
+            for path in paths:
+                pending.append(parse_executor.submit(html_to_text, book.read(path)))
+                if len(pending) < max_ahead:
+                    continue
+                done += 1
+                yield pending.popleft().result(), done / len(paths)
+            while pending:
+                done += 1
+                yield pending.popleft().result(), done / len(paths)
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,26 @@
+from typing import List, Optional, Tuple
+import pypdf
+
+# Kept free of app imports: this module is loaded in every extraction
+# process, which start with the "spawn" method.
+
+# Each process keeps the last document it opened, so consecutive page
+# ranges of the same book do not re-parse the xref table.
+_cached_reader: Optional[Tuple[str, pypdf.PdfReader]] = None
+
+
+def _get_reader(file_path: str) -> pypdf.PdfReader:
+    global _cached_reader
+    if _cached_reader is None or _cached_reader[0] != file_path:
+        if _cached_reader is not None:
+            _cached_reader[1].stream.close()
+        # A file object (not a path) so pypdf reads lazily instead of
+        # loading the whole document into memory
+        _cached_reader = (file_path, pypdf.PdfReader(open(file_path, "rb")))
+    return _cached_reader[1]
+
+
+def extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) by opening the spooled PDF in this process."""
+    reader = _get_reader(file_path)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
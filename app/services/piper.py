@@ -1,12 +1,122 @@
 import os
-import subprocess
+import json
 import stat
+import time
+import wave
+import struct
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Set
 from app.core.config import settings
 from app.core.logger import gui_logger
+from app.core import metrics
+from app.services.piper_pool import (
+    piper_pool, PiperWorkerError, SynthesisCancelledError,
+)
+from app.services.synthesis_cache import synthesis_cache
+
+def streaming_wav_header(sample_rate: int, channels: int = 1,
+                         sample_width: int = 2) -> bytes:
+    """
+    WAV header for a PCM stream of unknown length. The RIFF and data sizes
+    are set to the maximum, which players treat as "read until EOF".
+    """
+    byte_rate = sample_rate * channels * sample_width
+    data_size = 0xFFFFFFFF - 36
+    return (
+        b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate,
+                                byte_rate, channels * sample_width, sample_width * 8)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+class StreamProcesses:
+    """
+    Piper processes in raw-output mode for live streams.
+
+    Raw PCM has no utterance delimiter, so a process serves a single stream
+    (closing its stdin ends the audio) and pooled workers cannot be shared.
+    To keep the model load off the request path, `warm` processes are
+    started ahead of time and wait on stdin; each one taken is replaced in
+    the background. At most `max_streams` streams run at once. Event loop
+    only.
+    """
+
+    def __init__(self, max_streams: int, warm: int):
+        self.max_streams = max(1, max_streams)
+        self.warm = max(0, warm)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ready: List[asyncio.subprocess.Process] = []
+        self._starting: Set[asyncio.Task] = set()
+
+    @staticmethod
+    async def _spawn() -> asyncio.subprocess.Process:
+        cmd = [settings.PIPER_BIN_PATH, "--model", settings.MODEL_PATH, "--output-raw"]
+        if settings.USE_CUDA:
+            cmd.append("--cuda")
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    def fill(self):
+        """Start processes in the background until `warm` are ready or starting."""
+        while len(self._ready) + len(self._starting) < self.warm:
+            task = asyncio.ensure_future(self._start_warm())
+            self._starting.add(task)
+            task.add_done_callback(self._starting.discard)
+
+    async def _start_warm(self):
+        try:
+            self._ready.append(await self._spawn())
+        except Exception as e:
+            # The next stream starts its own process instead
+            gui_logger.log(f"⚠️ No se pudo precargar Piper (stream): {e}")
+
+    async def acquire(self) -> asyncio.subprocess.Process:
+        """Wait for a stream slot and take a warm process (or start one)."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_streams)
+        await self._slots.acquire()
+        try:
+            process = None
+            while self._ready and process is None:
+                candidate = self._ready.pop(0)
+                if candidate.returncode is None:
+                    process = candidate
+            if process is None:
+                # None warm yet: this stream pays the model load
+                process = await self._spawn()
+        except BaseException:
+            self._slots.release()
+            raise
+        self.fill()
+        return process
+
+    def release(self):
+        self._slots.release()
+
+    async def shutdown(self):
+        for task in list(self._starting):
+            task.cancel()
+        ready, self._ready = self._ready, []
+        for process in ready:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+
+stream_processes = StreamProcesses(
+    settings.STREAM_MAX_CONCURRENT, settings.STREAM_WARM_PROCESSES
+)
+
 
 class PiperService:
     @staticmethod
-    def synthesize(text: str, filename: str):
+    def synthesize(text: str, filename: str, job_id: str = None):
         # Asegurar directorio de salida con permisos
         output_dir = settings.AUDIO_OUTPUT_DIR
         os.makedirs(output_dir, exist_ok=True)
@@ -22,27 +132,101 @@ class PiperService:
         
         gui_logger.log(f"📥 Procesando: {text[:30]}...")
         
-        # Comando seguro sin shell=True y con input via stdin
-        cmd = [
-            settings.PIPER_BIN_PATH,
-            "--model", settings.MODEL_PATH,
-            "--output_file", output_path
-        ]
-        
-        if settings.USE_CUDA:
-            cmd.append("--cuda")
-        
+        # El texto va por stdin (JSON-lines) a un worker que ya tiene el modelo cargado;
+        # textos ya renderizados salen de la caché sin pasar por Piper
         try:
-            subprocess.run(
-                cmd, 
-                input=text.encode('utf-8'),
-                check=True
+            synthesis_cache.get_or_render(
+                text, output_path,
+                lambda path: PiperService._render(text, path, job_id),
+                flags=PiperService.synthesis_flags(),
             )
             
+            if not os.path.exists(output_path):
+                raise PiperWorkerError(f"Piper no generó {output_path}")
+            
             gui_logger.log(f"✅ Audio generado: {output_path}")
             return output_path
             
-        except subprocess.CalledProcessError as e:
+        except SynthesisCancelledError:
+            raise
+        except PiperWorkerError as e:
             error_msg = f"Error en Piper: {str(e)}"
             gui_logger.log(f"❌ {error_msg}")
             raise Exception(error_msg)
+
+    @staticmethod
+    def _render(text: str, output_path: str, job_id: str = None):
+        started = time.perf_counter()
+        piper_pool.synthesize(text, output_path, job_id)
+        elapsed = time.perf_counter() - started
+        metrics.piper_synthesis_seconds.observe(elapsed)
+        audio_seconds = PiperService.wav_seconds(output_path)
+        if audio_seconds:
+            metrics.piper_audio_seconds.inc(audio_seconds)
+            metrics.piper_real_time_factor.observe(elapsed / audio_seconds)
+
+    @staticmethod
+    def wav_seconds(path: str) -> float:
+        """Duration of a WAV file from its header (0 if unreadable)."""
+        try:
+            with wave.open(path, "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (OSError, EOFError, wave.Error):
+            return 0.0
+
+    @staticmethod
+    def synthesis_flags() -> dict:
+        """Options that change the rendered audio (part of the cache key)."""
+        return {"format": "wav"}
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def sample_rate() -> int:
+        """Output rate of the voice, from the model's .onnx.json config."""
+        try:
+            with open(f"{settings.MODEL_PATH}.json", "r", encoding="utf-8") as f:
+                return int(json.load(f)["audio"]["sample_rate"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 22050
+
+    @staticmethod
+    async def stream_wav(text: str) -> AsyncIterator[bytes]:
+        """
+        Yield a WAV header followed by PCM as soon as Piper produces it.
+        The Piper process is taken when iteration starts, so a response
+        that is never sent holds neither a stream slot nor a process.
+        """
+        process = await stream_processes.acquire()
+        
+        async def feed():
+            try:
+                process.stdin.write(text.encode("utf-8"))
+                await process.stdin.drain()
+                process.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        
+        writer = asyncio.create_task(feed())
+        try:
+            yield streaming_wav_header(PiperService.sample_rate())
+            while True:
+                data = await process.stdout.read(settings.STREAM_READ_BYTES)
+                if not data:
+                    break
+                yield data
+            await process.wait()
+            if process.returncode != 0:
+                gui_logger.log(
+                    f"❌ Piper (stream) terminó con código {process.returncode}"
+                )
+        finally:
+            writer.cancel()
+            # Client went away mid-stream: do not keep rendering
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stream_processes.release()
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return synthesis_cache.stats()
@@ -0,0 +1,339 @@
+import os
+import json
+import threading
+import subprocess
+from typing import List, Optional, Set
+from app.core.config import settings
+from app.core.logger import gui_logger
+
+
+class PiperWorkerError(Exception):
+    """Raised when a Piper worker dies or answers with garbage."""
+
+
+class SynthesisCancelledError(PiperWorkerError):
+    """Raised for requests of a job that was cancelled."""
+
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+
+
+class PiperWorker:
+    """
+    A long-lived Piper process running in JSON-lines mode.
+
+    The voice model is loaded once when the process starts; each request is a
+    single JSON line on stdin and Piper answers with the path of the WAV it
+    wrote on stdout.
+    """
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.busy = False
+        # Job whose chunk is being rendered, so cancelling it can kill the process
+        self.job_id: Optional[str] = None
+
+    def _build_command(self) -> List[str]:
+        cmd = [
+            settings.PIPER_BIN_PATH,
+            "--model", settings.MODEL_PATH,
+            "--json-input",
+            "--output_dir", os.path.abspath(settings.AUDIO_OUTPUT_DIR),
+        ]
+        if settings.USE_CUDA:
+            cmd.append("--cuda")
+        return cmd
+
+    def start(self):
+        os.makedirs(settings.AUDIO_OUTPUT_DIR, exist_ok=True)
+        self.process = subprocess.Popen(
+            self._build_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            if self.process.stdin:
+                self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        finally:
+            self.process = None
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def is_alive(self) -> bool:
+        # Read once: the pool restarts workers without holding its lock
+        process = self.process
+        return process is not None and process.poll() is None
+
+    def cpu_seconds(self) -> float:
+        """User + system CPU of the Piper process so far (Linux /proc; 0 elsewhere)."""
+        try:
+            with open(f"/proc/{self.process.pid}/stat", "rb") as f:
+                # Fields after the ")" that closes the command name; utime
+                # and stime are 14 and 15
+                fields = f.read().rsplit(b")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        except (AttributeError, OSError, IndexError, ValueError):
+            return 0.0
+
+    def synthesize(self, text: str, output_path: str, timeout: float = 0) -> str:
+        """
+        Render one request. After `timeout` seconds (0 = no limit) the
+        process is killed, so a hung Piper fails the request instead of
+        holding the worker forever.
+        """
+        request = json.dumps(
+            {"text": text, "output_file": output_path}, ensure_ascii=False
+        )
+        process = self.process
+        if process is None:
+            raise PiperWorkerError(f"worker {self.worker_id} is not running")
+        expired = threading.Event()
+        watchdog = None
+        if timeout > 0:
+            def expire():
+                expired.set()
+                try:
+                    process.kill()
+                except OSError:
+                    pass
+            watchdog = threading.Timer(timeout, expire)
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            process.stdin.write(request + "\n")
+            process.stdin.flush()
+            line = process.stdout.readline()
+        except (OSError, ValueError) as e:
+            raise PiperWorkerError(f"worker {self.worker_id} pipe error: {e}")
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
+
+        if expired.is_set():
+            raise PiperWorkerError(
+                f"worker {self.worker_id} timed out after {timeout:g}s"
+            )
+        if not line:
+            code = self.process.poll()
+            raise PiperWorkerError(f"worker {self.worker_id} exited (code {code})")
+        return line.strip()
+
+
+class PiperPool:
+    """
+    Fixed-size pool of Piper workers shared by every synthesis caller.
+
+    Workers are started lazily on first use, checked out one request at a time
+    and restarted automatically if they crash, either on checkout, after a
+    failed request or from the periodic health check. `reserved` workers are
+    kept for interactive requests (no job id): book chunks only take a worker
+    while more than that are idle, so /synthesize never waits behind them.
+    """
+
+    def __init__(self, size: int, health_check_interval: float, reserved: int = 0,
+                 request_timeout: float = 0):
+        self.size = max(1, size)
+        # Book chunks always get at least one worker
+        self.reserved = min(max(0, reserved), self.size - 1)
+        self.health_check_interval = health_check_interval
+        self.request_timeout = request_timeout
+        self._workers: List[PiperWorker] = []
+        self._idle: List[PiperWorker] = []
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._stop_event = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._cancelled: Set[str] = set()
+        # Piper CPU used by the calling thread's requests, see take_cpu_seconds()
+        self._thread_cpu = threading.local()
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            self._stop_event.clear()
+            for worker_id in range(self.size):
+                worker = PiperWorker(worker_id)
+                worker.start()
+                self._workers.append(worker)
+                self._idle.append(worker)
+            self._available.notify_all()
+            if self.health_check_interval > 0:
+                self._monitor = threading.Thread(target=self._monitor_loop, daemon=True)
+                self._monitor.start()
+        gui_logger.log(f"🔊 Piper pool iniciado con {self.size} workers")
+
+    def shutdown(self):
+        self._stop_event.set()
+        with self._lock:
+            workers, self._workers, self._idle = self._workers, [], []
+            idle = [w for w in workers if not w.busy]
+            for worker in workers:
+                if worker.busy and worker.is_alive():
+                    # Its thread fails the request and stops the worker
+                    worker.process.kill()
+        for worker in idle:
+            worker.stop()
+
+    def _checkout(self, job_id: Optional[str] = None) -> PiperWorker:
+        if not self._workers:
+            self.start()
+        # Interactive requests may take the last idle workers, book chunks may not
+        keep = 0 if job_id is None else self.reserved
+        with self._available:
+            while len(self._idle) <= keep:
+                if job_id is not None and job_id in self._cancelled:
+                    raise SynthesisCancelledError(f"job {job_id} cancelled")
+                self._available.wait()
+            worker = self._idle.pop()
+            worker.busy = True
+        if not worker.is_alive():
+            gui_logger.log(f"♻️ Reiniciando Piper worker {worker.worker_id} (caído)")
+            self._restart(worker)
+        return worker
+
+    def _restart(self, worker: PiperWorker):
+        """
+        Restart a worker checked out by the caller. Runs without the lock
+        (stopping a process can take seconds); skipped once the pool is
+        shut down, so no process is left behind.
+        """
+        if self._stop_event.is_set():
+            return
+        worker.restart()
+        if self._stop_event.is_set():
+            worker.stop()
+
+    def _release(self, worker: PiperWorker):
+        with self._available:
+            worker.busy = False
+            worker.job_id = None
+            if worker in self._workers:
+                self._idle.append(worker)
+                # Waiters differ in how many idle workers they need: wake them all
+                self._available.notify_all()
+                return
+        # The pool was shut down while it was busy
+        worker.stop()
+
+    def synthesize(self, text: str, output_path: str,
+                   job_id: Optional[str] = None) -> str:
+        """Render `text` into `output_path` on the next free worker."""
+        output_path = os.path.abspath(output_path)
+        if job_id is not None and job_id in self._cancelled:
+            # Do not wait for a worker only to refuse the request
+            raise SynthesisCancelledError(f"job {job_id} cancelled")
+        worker = self._checkout(job_id)
+        try:
+            with self._lock:
+                if job_id is not None and job_id in self._cancelled:
+                    raise SynthesisCancelledError(f"job {job_id} cancelled")
+                worker.job_id = job_id
+            cpu_before = worker.cpu_seconds()
+            path = worker.synthesize(text, output_path, self.request_timeout)
+            used = max(0.0, worker.cpu_seconds() - cpu_before)
+            self._thread_cpu.seconds = getattr(self._thread_cpu, "seconds", 0.0) + used
+            return path
+        except SynthesisCancelledError:
+            raise
+        except PiperWorkerError:
+            with self._lock:
+                cancelled = job_id is not None and job_id in self._cancelled
+                # Out of cancel_job's reach while its process is replaced
+                worker.job_id = None
+            self._restart(worker)
+            if cancelled:
+                raise SynthesisCancelledError(f"job {job_id} cancelled")
+            raise
+        finally:
+            self._release(worker)
+
+    def take_cpu_seconds(self) -> float:
+        """Piper process CPU spent on this thread's requests since the last call."""
+        seconds = getattr(self._thread_cpu, "seconds", 0.0)
+        self._thread_cpu.seconds = 0.0
+        return seconds
+
+    def cancel_job(self, job_id: str) -> int:
+        """
+        Refuse further requests for `job_id` and kill the workers rendering
+        it; their threads return at once and the workers are restarted.
+        Returns the number of processes killed.
+        """
+        killed = 0
+        with self._lock:
+            self._cancelled.add(job_id)
+            for worker in self._workers:
+                if worker.busy and worker.job_id == job_id and worker.is_alive():
+                    worker.process.kill()
+                    killed += 1
+            # Its requests waiting for a worker give up
+            self._available.notify_all()
+        return killed
+
+    def forget_job(self, job_id: str):
+        with self._lock:
+            self._cancelled.discard(job_id)
+
+    def health_check(self) -> dict:
+        """Restart dead idle workers and report the pool state."""
+        with self._lock:
+            dead = [w for w in self._idle if not w.is_alive()]
+            # Checked out, so no request gets them while they restart
+            for worker in dead:
+                self._idle.remove(worker)
+                worker.busy = True
+        for worker in dead:
+            gui_logger.log(
+                f"♻️ Health check: reiniciando Piper worker {worker.worker_id}"
+            )
+            try:
+                self._restart(worker)
+            finally:
+                self._release(worker)
+        return self.stats()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "reserved": self.reserved,
+                "alive": sum(1 for w in self._workers if w.is_alive()),
+                "busy": sum(1 for w in self._workers if w.busy),
+                "restarts": sum(w.restarts for w in self._workers),
+            }
+
+    def _monitor_loop(self):
+        while not self._stop_event.wait(self.health_check_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                gui_logger.log(f"⚠️ Error en health check de Piper: {e}")
+
+
+piper_pool = PiperPool(
+    settings.PIPER_POOL_SIZE,
+    settings.PIPER_HEALTH_CHECK_INTERVAL,
+    settings.PIPER_INTERACTIVE_WORKERS,
+    settings.PIPER_REQUEST_TIMEOUT,
+)
@@ -0,0 +1,60 @@
+import os
+import uuid
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.executors import io_executor, run_in
+from app.core.logger import gui_logger
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+
+class SpoolService:
+    """
+    Streams uploads to disk so a book is never held in RAM as a whole.
+    The background processor then works from the spooled file path.
+    """
+
+    READ_SIZE = 1024 * 1024
+
+    @staticmethod
+    async def spool_upload(file: UploadFile) -> str:
+        """
+        Copy the upload to UPLOAD_SPOOL_DIR in READ_SIZE pieces.
+        Returns the spool path; raises UploadTooLargeError over the limit.
+        """
+        os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+        _, ext = os.path.splitext(file.filename or "")
+        spool_path = os.path.join(
+            settings.UPLOAD_SPOOL_DIR, f"{uuid.uuid4()}{ext.lower()}"
+        )
+
+        written = 0
+        try:
+            with open(spool_path, "wb") as out:
+                while True:
+                    piece = await file.read(SpoolService.READ_SIZE)
+                    if not piece:
+                        break
+                    written += len(piece)
+                    if written > settings.MAX_UPLOAD_BYTES:
+                        raise UploadTooLargeError(
+                            f"Upload exceeds {settings.MAX_UPLOAD_BYTES} bytes"
+                        )
+                    await run_in(io_executor, out.write, piece)
+        except BaseException:
+            SpoolService.remove(spool_path)
+            raise
+
+        gui_logger.log(f"📦 Upload en spool: {spool_path} ({written} bytes)")
+        return spool_path
+
+    @staticmethod
+    def remove(spool_path: str):
+        try:
+            os.remove(spool_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            gui_logger.log(f"⚠️ No se pudo borrar el spool {spool_path}: {e}")
@@ -1,12 +1,137 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
 from google.cloud import storage
+from google.cloud.storage.retry import DEFAULT_RETRY
 from app.core.config import settings
 from app.core.logger import gui_logger
+from app.core import metrics
 from datetime import timedelta
 
+PUBLIC_URL_BASE = "https://storage.googleapis.com"
+
 class StorageService:
+    _client = None
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls) -> storage.Client:
+        """
+        Shared client, created on first use. Credentials are resolved once and
+        the HTTP session keeps a connection pool sized for the upload workers.
+        """
+        if cls._client is None:
+            with cls._client_lock:
+                if cls._client is None:
+                    # Looks for GOOGLE_APPLICATION_CREDENTIALS env var
+                    client = storage.Client()
+                    adapter = HTTPAdapter(
+                        pool_connections=settings.GCS_HTTP_POOL_SIZE,
+                        pool_maxsize=settings.GCS_HTTP_POOL_SIZE,
+                    )
+                    client._http.mount("https://", adapter)
+                    cls._client = client
+        return cls._client
+
+    @staticmethod
+    def _split_gs_uri(gs_uri: str):
+        parts = gs_uri[len("gs://"):].split("/", 1)
+        if len(parts) != 2 or not parts[0] or not parts[1]:
+            return None
+        return parts
+
+    @staticmethod
+    def upload(file_path: str, destination_blob_name: str,
+               content_type: str = None) -> str:
+        """
+        Uploads a file to BUCKET_NAME and returns its gs:// URI; raises on error.
+        
+        Uploads are resumable (sent in GCS_RESUMABLE_CHUNK_MB pieces, each
+        retried by the client library). Files above GCS_COMPOSITE_THRESHOLD_MB
+        are sent as parallel parts and composed server-side.
+        """
+        bucket = StorageService.get_client().bucket(settings.BUCKET_NAME)
+        size = os.path.getsize(file_path)
+        composite = size >= settings.GCS_COMPOSITE_THRESHOLD_MB * 1024 * 1024
+        
+        started = time.perf_counter()
+        try:
+            if composite:
+                StorageService._upload_composite(
+                    bucket, file_path, destination_blob_name, content_type
+                )
+            else:
+                blob = bucket.blob(
+                    destination_blob_name,
+                    chunk_size=settings.GCS_RESUMABLE_CHUNK_MB * 1024 * 1024,
+                )
+                blob.upload_from_filename(
+                    file_path, content_type=content_type, retry=DEFAULT_RETRY
+                )
+        except Exception:
+            metrics.upload_errors.inc()
+            raise
+        method = "composite" if composite else "resumable"
+        metrics.upload_seconds.labels(method=method).observe(
+            time.perf_counter() - started
+        )
+        metrics.upload_bytes.observe(size)
+        
+        # NOTE: ACLs are disabled in Uniform Bucket-Level Access.
+        # We skip make_public(). If public access is needed, configure the
+        # bucket policy.
+        return f"gs://{settings.BUCKET_NAME}/{destination_blob_name}"
+
     @staticmethod
-    def upload_file(file_path: str, destination_blob_name: str) -> str:
+    def _upload_composite(bucket, file_path: str, destination_blob_name: str,
+                          content_type: str = None):
+        """
+        Parallel composite upload: byte ranges as temporary objects, then
+        compose.
+        """
+        size = os.path.getsize(file_path)
+        # compose() accepts at most 32 source objects
+        part_size = max(-(-size // 32), settings.GCS_COMPOSITE_PART_MB * 1024 * 1024)
+        ranges = [
+            (offset, min(part_size, size - offset))
+            for offset in range(0, size, part_size)
+        ]
+        parts = [
+            bucket.blob(f"{destination_blob_name}.part-{i:02d}")
+            for i in range(len(ranges))
+        ]
+        
+        def upload_part(part, offset, length):
+            with open(file_path, "rb") as f:
+                f.seek(offset)
+                part.upload_from_file(f, size=length, retry=DEFAULT_RETRY)
+        
+        try:
+            parallelism = settings.GCS_COMPOSITE_PARALLELISM
+            with ThreadPoolExecutor(max_workers=parallelism) as pool:
+                futures = [
+                    pool.submit(upload_part, part, offset, length)
+                    for part, (offset, length) in zip(parts, ranges)
+                ]
+                for future in futures:
+                    future.result()
+            
+            blob = bucket.blob(destination_blob_name)
+            blob.content_type = content_type
+            blob.compose(parts, retry=DEFAULT_RETRY)
+        finally:
+            for part in parts:
+                try:
+                    part.delete()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def upload_file(file_path: str, destination_blob_name: str,
+                    content_type: str = None) -> str:
         """
         Uploads a file to the bucket.
         Returns the gs:// URI (source of truth for Fog Computing).
@@ -20,18 +145,9 @@ class StorageService:
         gui_logger.log(f"☁️ Subiendo a GCS: {bucket_name}/{destination_blob_name}...")
 
         try:
-            # Initialize client (looks for GOOGLE_APPLICATION_CREDENTIALS env var)
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(bucket_name)
-            blob = bucket.blob(destination_blob_name)
-
-            blob.upload_from_filename(file_path)
-
-            # NOTE: ACLs are disabled in Uniform Bucket-Level Access.
-            # We skip make_public(). If public access is needed, configure the bucket policy.
-            
-            gs_uri = f"gs://{bucket_name}/{destination_blob_name}"
-            # public_url = blob.public_url # reliant on being public
+            gs_uri = StorageService.upload(
+                file_path, destination_blob_name, content_type
+            )
             
             gui_logger.log(f"✅ Subida exitosa: {destination_blob_name}")
             gui_logger.log(f"   📎 GS URI: {gs_uri}")
@@ -44,30 +160,40 @@ class StorageService:
             # (El audio se generó bien localmente)
             return f"error-upload: {str(e)}"
     
+    @staticmethod
+    def exists(gs_uri: str) -> bool:
+        """Whether the object behind a gs:// URI exists."""
+        parts = StorageService._split_gs_uri(gs_uri)
+        if not parts:
+            return False
+        bucket_name, blob_name = parts
+        return StorageService.get_client().bucket(bucket_name).blob(blob_name).exists()
+    
+    @staticmethod
+    def delete_prefix(prefix: str) -> int:
+        """Delete every object under `prefix` in BUCKET_NAME; returns how many."""
+        bucket = StorageService.get_client().bucket(settings.BUCKET_NAME)
+        deleted = 0
+        for blob in bucket.list_blobs(prefix=prefix):
+            blob.delete()
+            deleted += 1
+        return deleted
+    
     @staticmethod
     def get_public_url(gs_uri: str) -> str:
         """
         Converts gs:// URI to public HTTPS URL.
+        Pure string operation (same URL as blob.public_url), no client needed.
         """
         if not gs_uri.startswith("gs://"):
             return gs_uri  # Already a URL or invalid
         
-        try:
-            # Extract bucket and blob name from gs:// URI
-            parts = gs_uri.replace("gs://", "").split("/", 1)
-            if len(parts) != 2:
-                return gs_uri
-            
-            bucket_name, blob_name = parts
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(bucket_name)
-            blob = bucket.blob(blob_name)
-            
-            # Return public URL
-            return blob.public_url
-        except Exception as e:
-            gui_logger.log(f"⚠️ Error obteniendo URL pública: {str(e)}")
+        parts = StorageService._split_gs_uri(gs_uri)
+        if not parts:
             return gs_uri
+        
+        bucket_name, blob_name = parts
+        return f"{PUBLIC_URL_BASE}/{bucket_name}/{quote(blob_name, safe='/~')}"
     
     @staticmethod
     def get_signed_url(gs_uri: str, expiration_minutes: int = 60) -> str:
@@ -78,12 +204,12 @@ class StorageService:
             return gs_uri
         
         try:
-            parts = gs_uri.replace("gs://", "").split("/", 1)
-            if len(parts) != 2:
+            parts = StorageService._split_gs_uri(gs_uri)
+            if not parts:
                 return gs_uri
             
             bucket_name, blob_name = parts
-            storage_client = storage.Client()
+            storage_client = StorageService.get_client()
             bucket = storage_client.bucket(bucket_name)
             blob = bucket.blob(blob_name)
             
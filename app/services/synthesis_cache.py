@@ -0,0 +1,181 @@
+import os
+import re
+import uuid
+import shutil
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+
+
+def normalize_text(text: str) -> str:
+    """Texts that differ only in Unicode form or whitespace render identically."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class SynthesisCache:
+    """
+    Content-addressed cache of rendered audio.
+
+    Entries live in `cache_dir` as `<sha256>.wav`, keyed by the normalized
+    text, the voice model file and the synthesis flags. Entries are evicted
+    least-recently-used first once the directory exceeds `max_bytes`.
+    Renders go to a temp file that is renamed into place, and concurrent
+    requests for the same key wait for the first one instead of rendering
+    again.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _load(self):
+        """Index existing entries, oldest access first."""
+        if self._loaded:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(".wav"):
+                continue
+            if ".tmp-" in entry.name:
+                # Leftover from an interrupted render
+                os.remove(entry.path)
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._loaded = True
+
+    def _model_fingerprint(self) -> str:
+        path = os.path.abspath(settings.MODEL_PATH or "")
+        try:
+            stat = os.stat(path)
+            return f"{path}:{stat.st_size}:{int(stat.st_mtime)}"
+        except OSError:
+            return path
+
+    def make_key(self, text: str, flags: Optional[dict] = None) -> str:
+        digest = hashlib.sha256()
+        digest.update(normalize_text(text).encode("utf-8"))
+        digest.update(b"\0" + self._model_fingerprint().encode("utf-8"))
+        for name, value in sorted((flags or {}).items()):
+            digest.update(f"\0{name}={value}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def _materialize(self, key: str, output_path: str):
+        """Expose a cache entry at output_path (hard link, copy as fallback)."""
+        source = self._path(key)
+        if os.path.abspath(source) == os.path.abspath(output_path):
+            return
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        try:
+            os.link(source, output_path)
+        except OSError:
+            shutil.copyfile(source, output_path)
+
+    def _touch(self, key: str):
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self, keep: str):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            del self._entries[key]
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def get_or_render(self, text: str, output_path: str,
+                      render: Callable[[str], None],
+                      flags: Optional[dict] = None) -> str:
+        """
+        Place audio for `text` at `output_path`, rendering it with
+        `render(tmp_path)` only if no cached copy exists.
+        """
+        if not self.enabled:
+            render(output_path)
+            return output_path
+
+        key = self.make_key(text, flags)
+        while True:
+            with self._lock:
+                self._load()
+                if key in self._entries and os.path.exists(self._path(key)):
+                    self.hits += 1
+                    self._touch(key)
+                    self._materialize(key, output_path)
+                    return output_path
+                waiter = self._in_flight.get(key)
+                if waiter is None:
+                    self.misses += 1
+                    done = self._in_flight[key] = threading.Event()
+                    break
+            # Same text is being rendered right now: wait and re-check
+            waiter.wait()
+
+        tmp_path = os.path.join(self.cache_dir, f"{key}.tmp-{uuid.uuid4().hex}.wav")
+        try:
+            render(tmp_path)
+            os.replace(tmp_path, self._path(key))
+            with self._lock:
+                size = os.path.getsize(self._path(key))
+                self._total_bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+                self._evict(keep=key)
+                self._materialize(key, output_path)
+            return output_path
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self._lock:
+                del self._in_flight[key]
+            done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+synthesis_cache = SynthesisCache(
+    settings.SYNTHESIS_CACHE_DIR, settings.SYNTHESIS_CACHE_MAX_BYTES
+)
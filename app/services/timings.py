@@ -0,0 +1,98 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from app.schemas.jobs import ChunkTiming, JobTimings, StageTiming
+
+
+class Span:
+    """Measurements of one timed step; the caller fills in what it produced."""
+    __slots__ = ("chars", "audio_seconds", "bytes", "cpu_seconds")
+
+    def __init__(self, chars: int = 0, audio_seconds: float = 0.0, bytes: int = 0):
+        self.chars = chars
+        self.audio_seconds = audio_seconds
+        self.bytes = bytes
+        # CPU used outside this thread (e.g. the Piper process)
+        self.cpu_seconds = 0.0
+
+
+class JobTimer:
+    """
+    Timing spans of one book job, aggregated per stage and per chunk.
+
+    Spans are measured on the thread doing the work: wall time with
+    perf_counter and CPU with thread_time, so time spent waiting for an
+    executor slot is not charged to the stage. Thread-safe. Starts from the
+    totals of earlier runs when a job is resumed.
+    """
+
+    def __init__(self, previous: Optional[JobTimings] = None):
+        previous = previous or JobTimings()
+        self._lock = threading.Lock()
+        self._base_wall = previous.wall_seconds
+        self._started = time.perf_counter()
+        self._stages: Dict[str, StageTiming] = {
+            name: stage.model_copy() for name, stage in previous.stages.items()
+        }
+        self._chunks: Dict[int, ChunkTiming] = {
+            chunk.part: chunk.model_copy(deep=True) for chunk in previous.chunks
+        }
+
+    def record(self, stage: str, wall: float, cpu: float, part: int = None,
+               chars: int = 0, audio_seconds: float = 0.0, bytes: int = 0):
+        with self._lock:
+            totals = self._stages.get(stage)
+            if totals is None:
+                totals = self._stages[stage] = StageTiming()
+            totals.count += 1
+            totals.wall_seconds += wall
+            totals.cpu_seconds += cpu
+            totals.chars += chars
+            totals.audio_seconds += audio_seconds
+            totals.bytes += bytes
+            if part is None:
+                return
+            chunk = self._chunks.get(part)
+            if chunk is None:
+                chunk = self._chunks[part] = ChunkTiming(part=part)
+            chunk.wall_seconds[stage] = chunk.wall_seconds.get(stage, 0.0) + wall
+            chunk.cpu_seconds[stage] = chunk.cpu_seconds.get(stage, 0.0) + cpu
+            # Re-rendering a part replaces what it produced
+            chunk.chars = chars or chunk.chars
+            chunk.audio_seconds = audio_seconds or chunk.audio_seconds
+            chunk.bytes = bytes or chunk.bytes
+
+    @contextmanager
+    def span(self, stage: str, part: int = None, **produced) -> Iterator[Span]:
+        span = Span(**produced)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            self.record(
+                stage,
+                time.perf_counter() - wall,
+                time.thread_time() - cpu + span.cpu_seconds,
+                part, span.chars, span.audio_seconds, span.bytes,
+            )
+
+    def wrap(self, stage: str, func: Callable, part: int = None) -> Callable:
+        """`func` timed as `stage` on whichever thread ends up calling it."""
+        def timed(*args, **kwargs):
+            with self.span(stage, part):
+                return func(*args, **kwargs)
+        return timed
+
+    def snapshot(self) -> JobTimings:
+        with self._lock:
+            return JobTimings(
+                wall_seconds=self._base_wall + time.perf_counter() - self._started,
+                stages={
+                    name: stage.model_copy() for name, stage in self._stages.items()
+                },
+                chunks=[
+                    self._chunks[part].model_copy(deep=True)
+                    for part in sorted(self._chunks)
+                ],
+            )
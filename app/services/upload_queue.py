@@ -0,0 +1,151 @@
+import time
+import random
+import asyncio
+import threading
+import requests
+from typing import Callable, ContextManager, Optional
+from google.api_core import exceptions as gcs_exceptions
+from google.auth.exceptions import TransportError
+from app.core.config import settings
+from app.core.executors import run_in_settled, upload_executor
+from app.core.logger import gui_logger
+from app.services.storage import StorageService
+
+# Errors worth another attempt: throttling, 5xx and dropped connections.
+# Anything else (auth, missing bucket, bad request) fails straight away.
+TRANSIENT_ERRORS = (
+    gcs_exceptions.TooManyRequests,
+    gcs_exceptions.InternalServerError,
+    gcs_exceptions.BadGateway,
+    gcs_exceptions.ServiceUnavailable,
+    gcs_exceptions.GatewayTimeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    TransportError,
+)
+
+
+class UploadCancelledError(Exception):
+    """Raised instead of uploading (or retrying) a part of a cancelled job."""
+
+
+class UploadQueue:
+    """
+    Upload stage of the book pipeline.
+
+    Parts are handed over as soon as they are encoded, so synthesis never
+    waits on the network. At most `workers` uploads run at once on the upload
+    executor and up to `queue_size` more wait for a slot; past that,
+    `submit()` blocks, which in turn holds back synthesis.
+    """
+
+    def __init__(self, workers: int, queue_size: int, max_retries: int,
+                 retry_base_seconds: float):
+        self.capacity = workers + queue_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.queued = 0
+        self.active = 0
+        self.retries = 0
+        self.failures = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, self.retry_base_seconds * 2 ** attempt)
+
+    def _upload_with_retry(self, file_path: str, destination_blob_name: str,
+                           content_type: str = None,
+                           span: Callable[[], ContextManager] = None,
+                           cancelled: threading.Event = None) -> str:
+        if span is not None:
+            with span():
+                return self._upload_with_retry(
+                    file_path, destination_blob_name, content_type, None, cancelled
+                )
+        attempt = 0
+        while True:
+            if cancelled is not None and cancelled.is_set():
+                raise UploadCancelledError(destination_blob_name)
+            try:
+                return StorageService.upload(
+                    file_path, destination_blob_name, content_type
+                )
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                attempt += 1
+                self.retries += 1
+                gui_logger.log(
+                    f"🔁 Reintento {attempt}/{self.max_retries} de "
+                    f"{destination_blob_name} en {delay:.1f}s: {e}"
+                )
+                if cancelled is not None:
+                    # Backoff ends early on cancel
+                    cancelled.wait(delay)
+                else:
+                    time.sleep(delay)
+
+    async def submit(self, file_path: str, destination_blob_name: str,
+                     content_type: str = None,
+                     span: Callable[[], ContextManager] = None,
+                     cancelled: threading.Event = None) -> asyncio.Future:
+        """
+        Wait for room in the queue, then start the upload in the background.
+        The returned future resolves to the gs:// URI, or raises after the
+        last retry. `span()`, if given, is entered around the upload (retries
+        included) on the upload thread, for timing. Once `cancelled` is set
+        no further attempt is made, and cancelling the returned task waits
+        for an upload already in progress.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        # Uploads beyond UPLOAD_WORKERS wait inside the executor's own queue
+        task = asyncio.ensure_future(
+            self._run(file_path, destination_blob_name, content_type, span, cancelled)
+        )
+        # Not in _run's finally: a task cancelled before it starts never runs it
+        task.add_done_callback(lambda _: self._slots.release())
+        return task
+
+    async def _run(self, file_path: str, destination_blob_name: str,
+                   content_type: str = None,
+                   span: Callable[[], ContextManager] = None,
+                   cancelled: threading.Event = None) -> str:
+        self.active += 1
+        try:
+            return await run_in_settled(
+                upload_executor, cancelled, self._upload_with_retry,
+                file_path, destination_blob_name, content_type, span, cancelled,
+            )
+        except UploadCancelledError:
+            raise
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "waiting": self.queued,
+            "in_progress": self.active,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+upload_queue = UploadQueue(
+    settings.UPLOAD_WORKERS,
+    settings.UPLOAD_QUEUE_SIZE,
+    settings.UPLOAD_MAX_RETRIES,
+    settings.UPLOAD_RETRY_BASE_SECONDS,
+)
@@ -1,4 +1,5 @@
 import os
+import sys
 import argparse
 import requests
 import json
@@ -6,6 +7,10 @@ import time
 from tqdm import tqdm
 from pathlib import Path
 
+# Allow running as `python scripts/process_book.py` from the repo root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.services.chunking import ChunkingConfig, chunk_text
+
 # Configuration
 API_URL = "http://localhost:8000/api/v1/synthesize"
 OUTPUT_DIR = Path("generated_audio/books")
@@ -14,34 +19,20 @@ def clean_text(text: str) -> str:
     """Basic text cleanup."""
     return text.strip().replace("\n", " ")
 
-def split_text(text: str, max_chars=500) -> list[str]:
-    """Split text into chunks suitable for TTS."""
-    # This is a naive splitter. For production, use NLTK or similar.
-    chunks = []
-    current_chunk = ""
-    
-    sentences = text.replace(".", ".|").replace("?", "?|").replace("!", "!|").split("|")
-    
-    for sentence in sentences:
-        if len(current_chunk) + len(sentence) < max_chars:
-            current_chunk += sentence
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-            
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-        
-    return [c for c in chunks if c.strip()]
-
-def process_book(input_file: Path, book_id: str):
+def process_book(input_file: Path, book_id: str, config: ChunkingConfig):
     """Orchestrate the conversion."""
     print(f"📖 Reading {input_file}...")
     with open(input_file, "r", encoding="utf-8") as f:
         full_text = f.read()
 
-    chunks = split_text(full_text)
+    chunks = chunk_text(full_text, config)
+    sizes = [c.chars for c in chunks]
     print(f"🧩 Split into {len(chunks)} chunks.")
+    if sizes:
+        print(
+            f"   chars/chunk: min {min(sizes)}, "
+            f"avg {sum(sizes) // len(sizes)}, max {max(sizes)}"
+        )
     
     book_dir = OUTPUT_DIR / book_id
     book_dir.mkdir(parents=True, exist_ok=True)
@@ -52,7 +43,7 @@ def process_book(input_file: Path, book_id: str):
         chunk_id = f"{book_id}_part_{i:04d}"
         payload = {
             "id": chunk_id,
-            "texto": chunk
+            "texto": chunk.text
         }
         
         try:
@@ -79,6 +70,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fog Node Audiobook Orchestrator")
     parser.add_argument("--input", required=True, help="Path to text file")
     parser.add_argument("--id", required=True, help="Unique ID for the book")
+    parser.add_argument("--min-chars", type=int, default=100, help="Minimum chunk size")
+    parser.add_argument(
+        "--target-chars", type=int, default=500, help="Preferred chunk size"
+    )
+    parser.add_argument(
+        "--max-chars", type=int, default=500, help="Hard chunk size limit"
+    )
+    parser.add_argument(
+        "--first-chars", type=int, default=0,
+        help="Size of the first chunk (0 = target)",
+    )
     
     args = parser.parse_args()
-    process_book(Path(args.input), args.id)
+    config = ChunkingConfig(
+        min_chars=args.min_chars,
+        target_chars=args.target_chars,
+        max_chars=args.max_chars,
+        first_chars=args.first_chars,
+    )
+    process_book(Path(args.input), args.id, config)
@@ -0,0 +1,23 @@
+import pytest
+
+from app.services.epub_extraction import html_to_text
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"  \n",
+    b'<?xml version="1.0" encoding="utf-8"?>',
+    b"<!-- intentionally blank -->",
+])
+def test_empty_chapters_have_no_text(content):
+    assert html_to_text(content) == ""
+
+
+def test_block_elements_become_lines():
+    content = (
+        b"<html><head><title>Skip</title></head><body>"
+        b"<h1>Uno</h1><p>Hola</p><script>x()</script><p>mundo</p>"
+        b"</body></html>"
+    )
+    lines = [line for line in html_to_text(content).split("\n") if line]
+    assert lines == ["Uno", "Hola", "mundo"]
@@ -0,0 +1,252 @@
+import copy
+import time
+
+import pytest
+from google.api_core import exceptions as gcloud_exceptions
+from google.cloud import firestore
+
+from app.core import metrics
+from app.core.jobs import FirestoreJobManager
+from app.schemas.jobs import JobStatus
+
+# Background flushes only happen when something wakes the buffer up
+NEVER = 3600
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocument:
+    def __init__(self, db, doc_id):
+        self.db = db
+        self.id = doc_id
+
+    def set(self, data):
+        self.db.docs[self.id] = copy.deepcopy(data)
+
+    def get(self):
+        return FakeSnapshot(self.db.docs.get(self.id))
+
+    def update(self, data):
+        self.db.check_failure()
+        self.db.single_updates += 1
+        self.db.apply(self.id, data)
+
+    def delete(self):
+        self.db.docs.pop(self.id, None)
+
+
+class FakeCollection:
+    def __init__(self, db):
+        self.db = db
+
+    def document(self, doc_id):
+        return FakeDocument(self.db, doc_id)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def update(self, ref, data):
+        self.writes.append((ref.id, data))
+
+    def commit(self):
+        self.db.check_failure()
+        # All or nothing, like Firestore
+        for doc_id, _ in self.writes:
+            if doc_id not in self.db.docs:
+                raise gcloud_exceptions.NotFound(f"No document to update: {doc_id}")
+        for doc_id, data in self.writes:
+            self.db.apply(doc_id, data)
+        self.db.commits.append(list(self.writes))
+
+
+class FakeFirestore:
+    """The subset of the Firestore client FirestoreJobManager uses."""
+
+    def __init__(self):
+        self.docs = {}
+        self.commits = []
+        self.single_updates = 0
+        # Errors raised by the next commits/updates, oldest first
+        self.failures = []
+
+    def collection(self, name):
+        return FakeCollection(self)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def check_failure(self):
+        if self.failures:
+            raise self.failures.pop(0)
+
+    def apply(self, doc_id, data):
+        if doc_id not in self.docs:
+            raise gcloud_exceptions.NotFound(f"No document to update: {doc_id}")
+        doc = self.docs[doc_id]
+        for name, value in data.items():
+            if isinstance(value, firestore.ArrayUnion):
+                current = doc.setdefault(name, [])
+                current.extend(v for v in value.values if v not in current)
+            else:
+                doc[name] = value
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture
+def manager(db):
+    manager = FirestoreJobManager(client=db, flush_interval=NEVER)
+    yield manager
+    manager.close()
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_progress_updates_are_coalesced(manager, db):
+    job = manager.create_job("book.txt")
+    for processed in range(1, 6):
+        manager.update_progress(job.id, processed, 10)
+    manager.add_output_file(job.id, "gs://b/part_001.wav")
+    manager.add_output_file(job.id, "gs://b/part_002.wav", "flac")
+
+    assert db.docs[job.id]["processed_chunks"] == 0
+    manager.flush()
+
+    assert len(db.commits) == 1
+    assert len(db.commits[0]) == 1
+    stored = db.docs[job.id]
+    assert stored["processed_chunks"] == 5
+    assert stored["total_chunks"] == 10
+    assert stored["output_files"] == ["gs://b/part_001.wav", "gs://b/part_002.wav"]
+    assert stored["outputs"][1] == {"path": "gs://b/part_002.wav", "format": "flac"}
+
+
+def test_many_jobs_share_a_batch(manager, db):
+    jobs = [manager.create_job(f"book{i}.txt") for i in range(3)]
+    for job in jobs:
+        manager.update_progress(job.id, 1, 2)
+    manager.flush()
+
+    assert len(db.commits) == 1
+    assert {doc_id for doc_id, _ in db.commits[0]} == {job.id for job in jobs}
+
+
+def test_status_change_flushes_without_waiting_for_the_interval(manager, db):
+    job = manager.create_job("book.txt")
+    manager.update_progress(job.id, 3, 4)
+    manager.set_status(job.id, JobStatus.COMPLETED, "done")
+
+    assert wait_for(lambda: db.docs[job.id]["status"] == "completed")
+    assert db.docs[job.id]["processed_chunks"] == 3
+    assert db.docs[job.id]["message"] == "done"
+
+
+def test_failed_writes_are_requeued(manager, db):
+    job = manager.create_job("book.txt")
+    manager.update_progress(job.id, 1, 4)
+    manager.add_output_file(job.id, "gs://b/part_001.wav")
+    # The batch and the one-by-one retry both fail
+    db.failures = [
+        gcloud_exceptions.ServiceUnavailable("down"),
+        gcloud_exceptions.ServiceUnavailable("down"),
+    ]
+    failures = metrics.job_store_write_failures._default().value
+    manager.flush()
+    assert db.docs[job.id]["processed_chunks"] == 0
+    assert metrics.job_store_write_failures._default().value == failures + 1
+
+    # Newer values win over the requeued ones
+    manager.update_progress(job.id, 2)
+    manager.add_output_file(job.id, "gs://b/part_002.wav")
+    manager.flush()
+
+    stored = db.docs[job.id]
+    assert stored["processed_chunks"] == 2
+    assert stored["total_chunks"] == 4
+    assert stored["output_files"] == ["gs://b/part_001.wav", "gs://b/part_002.wav"]
+
+
+def test_deleted_job_does_not_block_the_others(manager, db):
+    kept = manager.create_job("kept.txt")
+    gone = manager.create_job("gone.txt")
+    manager.update_progress(kept.id, 2, 3)
+    manager.update_progress(gone.id, 1, 3)
+    # Deleted by another node, so the buffer still holds its update
+    del db.docs[gone.id]
+
+    manager.flush()
+
+    assert db.docs[kept.id]["processed_chunks"] == 2
+    assert gone.id not in db.docs
+    # Dropped, not retried forever
+    assert db.single_updates == 2
+    manager.flush()
+    assert db.single_updates == 2
+
+
+def test_reads_overlay_pending_writes(manager, db):
+    job = manager.create_job("book.txt")
+    manager.update_progress(job.id, 2, 5, "Rendering...")
+    manager.add_output_file(job.id, "gs://b/part_001.wav")
+
+    read = manager.get_job(job.id)
+
+    assert db.commits == []
+    assert read.processed_chunks == 2
+    assert read.total_chunks == 5
+    assert read.message == "Rendering..."
+    assert read.output_files == ["gs://b/part_001.wav"]
+    assert [o.path for o in read.outputs] == ["gs://b/part_001.wav"]
+
+
+def test_close_writes_everything_pending(db):
+    manager = FirestoreJobManager(client=db, flush_interval=NEVER)
+    job = manager.create_job("book.txt")
+    manager.update_progress(job.id, 4, 4)
+    manager.add_output_file(job.id, "gs://b/part_001.wav")
+
+    manager.close()
+
+    assert db.docs[job.id]["processed_chunks"] == 4
+    assert db.docs[job.id]["output_files"] == ["gs://b/part_001.wav"]
+
+    # Later writes go straight through
+    manager.set_status(job.id, JobStatus.COMPLETED)
+    assert db.docs[job.id]["status"] == "completed"
+
+
+def test_clear_outputs_drops_stored_and_pending(manager, db):
+    job = manager.create_job("book.txt")
+    manager.add_output_file(job.id, "gs://b/part_001.wav")
+    manager.flush()
+    manager.add_output_file(job.id, "gs://b/part_002.wav")
+
+    manager.clear_outputs(job.id)
+    manager.flush()
+
+    assert db.docs[job.id]["output_files"] == []
+    assert db.docs[job.id]["outputs"] == []
+    assert manager.get_job(job.id).output_files == []